@@ -0,0 +1,126 @@
+"""Module contenant le moteur audio : sons pré-décodés, pool de voix fixe et priorités"""
+import time
+import pygame
+
+
+# Réglages du mixer : petit buffer = latence inférieure à une frame (256 échantillons ≈ 6 ms à 44,1 kHz)
+MIXER_FREQUENCY = 44100
+MIXER_SIZE = -16
+MIXER_CHANNELS = 2
+MIXER_BUFFER = 256
+
+# Priorités des voix (une voix ne peut voler que des voix de priorité inférieure ou égale)
+PRIORITY_AMBIENT = 0
+PRIORITY_FOOTSTEP = 1
+PRIORITY_PLAYER = 2
+PRIORITY_WEAPON = 3
+
+
+def pre_init_mixer():
+    """Configure le mixer en faible latence (doit être appelé avant pygame.init())"""
+    pygame.mixer.pre_init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, MIXER_BUFFER)
+
+
+class AudioManager:
+    """Gestionnaire audio : charge chaque son une seule fois et le joue sur un pool de voix fixe"""
+    def __init__(self, voice_count=16, null_output=False, null_voice_duration=0.5):
+        self.voice_count = voice_count
+        self.null_voice_duration = null_voice_duration  # Durée simulée d'une voix sans sortie audio
+        self.sounds = {}  # Chemin -> pygame.mixer.Sound (PCM décodé en mémoire)
+
+        # Sortie nulle si demandée ou si aucun périphérique audio n'est disponible
+        self.null_output = null_output
+        if not self.null_output and not pygame.mixer.get_init():
+            try:
+                pygame.mixer.init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, MIXER_BUFFER)
+            except pygame.error:
+                self.null_output = True
+
+        if not self.null_output:
+            pygame.mixer.set_num_channels(voice_count)
+            self.channels = [pygame.mixer.Channel(i) for i in range(voice_count)]
+        else:
+            self.channels = [None] * voice_count
+
+        # État de chaque voix du pool
+        self.voice_priority = [0] * voice_count
+        self.voice_start = [0.0] * voice_count
+        self.voice_end = [0.0] * voice_count  # Utilisé seulement en sortie nulle
+        self.voice_sound = [None] * voice_count
+
+    def load(self, path):
+        """Décode un son une seule fois et retourne sa clé (le chemin)"""
+        if path not in self.sounds:
+            self.sounds[path] = None if self.null_output else pygame.mixer.Sound(path)
+        return path
+
+    def _is_busy(self, voice, now):
+        """Indique si une voix est en cours de lecture"""
+        if self.null_output:
+            return now < self.voice_end[voice]
+        return self.channels[voice].get_busy()
+
+    def _find_voice(self, priority, now):
+        """Retourne une voix libre, ou vole la voix la moins prioritaire et la plus ancienne"""
+        victim = None
+        for voice in range(self.voice_count):
+            if not self._is_busy(voice, now):
+                return voice
+            if self.voice_priority[voice] <= priority:
+                if victim is None or (self.voice_priority[voice], self.voice_start[voice]) < \
+                        (self.voice_priority[victim], self.voice_start[victim]):
+                    victim = voice
+        return victim
+
+    def play(self, key, priority=PRIORITY_PLAYER, volume=1.0, loops=0):
+        """Joue un son chargé (fire-and-forget) et retourne l'indice de la voix, ou None si refusé"""
+        if key not in self.sounds:
+            self.load(key)
+        now = time.perf_counter()
+        voice = self._find_voice(priority, now)
+        if voice is None:
+            return None
+
+        self.voice_priority[voice] = priority
+        self.voice_start[voice] = now
+        self.voice_sound[voice] = key
+        if self.null_output:
+            self.voice_end[voice] = now + self.null_voice_duration
+        else:
+            channel = self.channels[voice]
+            channel.play(self.sounds[key], loops=loops)
+            channel.set_volume(volume)
+        return voice
+
+    def set_voice_volume(self, voice, left, right=None):
+        """Règle le volume d'une voix (gauche/droite pour la stéréo)"""
+        if self.null_output or voice is None:
+            return
+        if right is None:
+            self.channels[voice].set_volume(left)
+        else:
+            self.channels[voice].set_volume(left, right)
+
+    def stop(self, voice):
+        """Arrête une voix"""
+        if voice is None:
+            return
+        self.voice_end[voice] = 0.0
+        if not self.null_output:
+            self.channels[voice].stop()
+
+    def active_voices(self):
+        """Retourne le nombre de voix en cours de lecture"""
+        now = time.perf_counter()
+        return sum(1 for voice in range(self.voice_count) if self._is_busy(voice, now))
+
+
+_audio_manager = None
+
+
+def get_audio_manager():
+    """Retourne le gestionnaire audio partagé (créé au premier appel)"""
+    global _audio_manager
+    if _audio_manager is None:
+        _audio_manager = AudioManager()
+    return _audio_manager
@@ -0,0 +1,75 @@
+"""Module contenant l'échantillonnage de Poisson (Bridson) utilisé par le pinceau de l'éditeur"""
+import math
+import random
+
+
+def poisson_disk_fill(center_x, center_z, radius, spacing, existing=(), max_points=64, attempts=12, rng=random):
+    """Remplit un disque de points espacés d'au moins spacing, en respectant les points existants
+
+    Retourne la liste des nouveaux points (x, z). Le nombre de points et d'essais est borné
+    pour que chaque coup de pinceau reste rapide.
+    """
+    cell_size = spacing / math.sqrt(2)
+    spacing_squared = spacing * spacing
+    radius_squared = radius * radius
+    grid = {}
+
+    def cell_of(x, z):
+        return int(math.floor(x / cell_size)), int(math.floor(z / cell_size))
+
+    def fits(x, z):
+        col, row = cell_of(x, z)
+        for i in range(col - 2, col + 3):
+            for j in range(row - 2, row + 3):
+                for other_x, other_z in grid.get((i, j), ()):
+                    dx = other_x - x
+                    dz = other_z - z
+                    if dx * dx + dz * dz < spacing_squared:
+                        return False
+        return True
+
+    def inside(x, z):
+        dx = x - center_x
+        dz = z - center_z
+        return dx * dx + dz * dz <= radius_squared
+
+    for x, z in existing:
+        grid.setdefault(cell_of(x, z), []).append((x, z))
+
+    active = []
+    new_points = []
+    while len(new_points) < max_points:
+        if not active:
+            # Nouvelle graine : un point libre au hasard dans le disque (comble les trous entre objets existants)
+            for _ in range(attempts):
+                angle = rng.random() * 2 * math.pi
+                distance = radius * math.sqrt(rng.random())
+                x = center_x + math.cos(angle) * distance
+                z = center_z + math.sin(angle) * distance
+                if fits(x, z):
+                    grid.setdefault(cell_of(x, z), []).append((x, z))
+                    active.append((x, z))
+                    new_points.append((x, z))
+                    break
+            else:
+                break  # Disque considéré comme plein
+            continue
+
+        index = rng.randrange(len(active))
+        base_x, base_z = active[index]
+        for _ in range(attempts):
+            angle = rng.random() * 2 * math.pi
+            distance = spacing * (1 + rng.random())
+            x = base_x + math.cos(angle) * distance
+            z = base_z + math.sin(angle) * distance
+            if inside(x, z) and fits(x, z):
+                grid.setdefault(cell_of(x, z), []).append((x, z))
+                active.append((x, z))
+                new_points.append((x, z))
+                break
+        else:
+            # Plus de place autour de ce point
+            active[index] = active[-1]
+            active.pop()
+
+    return new_points
@@ -0,0 +1,68 @@
+"""Module contenant le cycle jour/nuit (teintes du ciel, du sol et des objets)"""
+import pygame
+
+WHITE = (255, 255, 255)
+
+# Images clés de l'éclairage : (moment de la journée 0-1, teinte du ciel, du sol, des objets)
+# 0 = minuit, 0.5 = midi ; les teintes multiplient les couleurs des images
+DEFAULT_KEYFRAMES = (
+    (0.00, (40, 50, 95), (45, 50, 80), (60, 65, 100)),
+    (0.20, (40, 50, 95), (45, 50, 80), (60, 65, 100)),
+    (0.25, (255, 160, 120), (200, 150, 130), (210, 170, 150)),
+    (0.32, WHITE, WHITE, WHITE),
+    (0.70, WHITE, WHITE, WHITE),
+    (0.77, (255, 140, 90), (210, 140, 110), (220, 150, 120)),
+    (0.82, (40, 50, 95), (45, 50, 80), (60, 65, 100)),
+    (1.00, (40, 50, 95), (45, 50, 80), (60, 65, 100)),
+)
+
+
+def lerp_color(a, b, t):
+    """Interpolation linéaire entre deux couleurs RGB"""
+    return tuple(round(ca + (cb - ca) * t) for ca, cb in zip(a, b))
+
+
+def tint_surface(surface, tint):
+    """Multiplie les couleurs de l'image par la teinte (sur place, l'alpha est conservé) et la retourne"""
+    if tint != WHITE:
+        surface.fill(tint, special_flags=pygame.BLEND_RGB_MULT)
+    return surface
+
+
+class DayNightCycle:
+    """Cycle jour/nuit découpé en tranches de temps
+
+    Les teintes de chaque tranche sont interpolées une seule fois à la création ; pendant
+    le jeu, seul le numéro de tranche change. Les images teintées (ciel, sol, sprites) ne
+    sont donc recalculées qu'au passage d'une tranche à la suivante.
+    """
+    def __init__(self, day_length=600.0, start_time=0.35, buckets=96, keyframes=DEFAULT_KEYFRAMES):
+        self.day_length = day_length  # Durée d'une journée complète en secondes
+        self.time = start_time  # Moment de la journée (0-1)
+        self.buckets = buckets
+        self.table = [self._interpolate(keyframes, (bucket + 0.5) / buckets) for bucket in range(buckets)]
+        self.bucket = int(start_time * buckets) % buckets
+
+    @staticmethod
+    def _interpolate(keyframes, time):
+        for (start, *before), (end, *after) in zip(keyframes, keyframes[1:]):
+            if start <= time <= end:
+                t = (time - start) / (end - start) if end > start else 0.0
+                return tuple(lerp_color(a, b, t) for a, b in zip(before, after))
+        return tuple(keyframes[-1][1:])
+
+    def update(self, delta_time):
+        """Avance l'heure ; retourne True si la tranche de temps a changé"""
+        if self.day_length <= 0:
+            return False
+        self.time = (self.time + delta_time / self.day_length) % 1.0
+        bucket = int(self.time * self.buckets) % self.buckets
+        if bucket == self.bucket:
+            return False
+        self.bucket = bucket
+        return True
+
+    @property
+    def lighting(self):
+        """Teintes (ciel, sol, objets) de la tranche de temps en cours"""
+        return self.table[self.bucket]
@@ -0,0 +1,87 @@
+"""Module contenant l'historique d'annulation de l'éditeur, basé sur des commandes (diffs)"""
+
+
+class AddObjects:
+    """Ajout d'un ou plusieurs objets"""
+    def __init__(self, objects):
+        self.objects = list(objects)
+        self.entries = None  # Positions dans la liste, connues après la première annulation
+
+    def undo(self, editor):
+        self.entries = editor._delete_objects(self.objects)
+
+    def redo(self, editor):
+        editor._insert_objects(self.entries)
+
+
+class RemoveObjects:
+    """Suppression d'un ou plusieurs objets (mémorise leur position dans la liste)"""
+    def __init__(self, entries):
+        self.entries = entries  # Liste de (indice, objet) triée par indice
+
+    def undo(self, editor):
+        editor._insert_objects(self.entries)
+
+    def redo(self, editor):
+        self.entries = editor._delete_objects([obj for _, obj in self.entries])
+
+
+class MoveObjects:
+    """Déplacement d'un ou plusieurs objets (un glisser complet = une seule commande)"""
+    def __init__(self, objects, old_positions, new_positions):
+        self.objects = list(objects)
+        self.old_positions = old_positions
+        self.new_positions = new_positions
+
+    def undo(self, editor):
+        editor._set_positions(self.objects, self.old_positions)
+
+    def redo(self, editor):
+        editor._set_positions(self.objects, self.new_positions)
+
+
+class SetProperty:
+    """Modification d'une propriété sur un ou plusieurs objets (une valeur par objet)"""
+    def __init__(self, objects, key, old_values, new_values):
+        self.objects = list(objects)
+        self.key = key
+        self.old_values = old_values
+        self.new_values = new_values
+
+    def undo(self, editor):
+        editor._set_property(self.objects, self.key, self.old_values)
+
+    def redo(self, editor):
+        editor._set_property(self.objects, self.key, self.new_values)
+
+
+class EditHistory:
+    """Pile d'annulation/rétablissement : la mémoire dépend de la taille des modifications, pas de la map"""
+    def __init__(self, max_history=50):
+        self.commands = []
+        self.index = 0  # Nombre de commandes actuellement appliquées
+        self.max_history = max_history
+
+    def push(self, command):
+        """Enregistre une commande déjà appliquée à l'éditeur"""
+        del self.commands[self.index:]
+        self.commands.append(command)
+        if len(self.commands) > self.max_history:
+            self.commands.pop(0)
+        self.index = len(self.commands)
+
+    def undo(self, editor):
+        """Annule la dernière commande, retourne False s'il n'y a rien à annuler"""
+        if self.index == 0:
+            return False
+        self.index -= 1
+        self.commands[self.index].undo(editor)
+        return True
+
+    def redo(self, editor):
+        """Rétablit la dernière commande annulée, retourne False s'il n'y a rien à rétablir"""
+        if self.index == len(self.commands):
+            return False
+        self.commands[self.index].redo(editor)
+        self.index += 1
+        return True
@@ -0,0 +1,267 @@
+"""Module contenant les ennemis mobiles (statues) guidés par un champ de flux vers le joueur"""
+from collections import deque
+import math
+import numpy as np
+
+
+# Décalages des 8 voisins (ligne, colonne) utilisés pour orienter le champ de flux
+NEIGHBOR_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+# Hachage spatial pour la séparation : cellules voisines et nombre max d'ennemis examinés par cellule
+SEPARATION_CELLS = np.array([(dx, dz) for dx in (-1, 0, 1) for dz in (-1, 0, 1)], dtype=np.int64)
+SEPARATION_HASH = 1 << 20
+SEPARATION_NEIGHBORS_PER_CELL = 8
+
+
+class NavigationGrid:
+    """Grille de navigation dérivée des obstacles de la map et champ de flux vers une cible"""
+    def __init__(self, obstacles, cell_size=100, margin=10):
+        self.cell_size = cell_size
+        self.margin = margin  # Cellules libres ajoutées autour des obstacles (aussi quand la grille s'agrandit)
+
+        xs = [obj.x for obj in obstacles] or [0.0]
+        zs = [obj.z for obj in obstacles] or [0.0]
+        self.origin_x = min(xs) - margin * cell_size
+        self.origin_z = min(zs) - margin * cell_size
+        self.cols = int((max(xs) - self.origin_x) / cell_size) + margin + 1
+        self.rows = int((max(zs) - self.origin_z) / cell_size) + margin + 1
+
+        # Une cellule contenant un obstacle est infranchissable (compte par cellule pour les retraits)
+        self.blocked = np.zeros((self.rows, self.cols), dtype=bool)
+        self.obstacle_count = np.zeros((self.rows, self.cols), dtype=np.int32)
+        self.obstacle_cells = {}  # id(obstacle) -> cellule où il a été compté
+        self.distance = np.full((self.rows, self.cols), np.inf)
+        self.flow = np.zeros((self.rows, self.cols, 2), dtype=np.float32)  # Direction (x, z) par cellule
+        self.target_cell = None
+        for obj in obstacles:
+            self.add_obstacle(obj)
+
+    def cell_of(self, x, z):
+        """Retourne la cellule (ligne, colonne) contenant un point, bornée à la grille"""
+        col = int((x - self.origin_x) // self.cell_size)
+        row = int((z - self.origin_z) // self.cell_size)
+        return min(max(row, 0), self.rows - 1), min(max(col, 0), self.cols - 1)
+
+    def _grow(self, row, col):
+        """Agrandit la grille (plus la marge) pour qu'elle contienne la cellule (ligne, colonne) donnée"""
+        margin = self.margin
+        top = margin - row if row < 0 else 0
+        bottom = row - self.rows + 1 + margin if row >= self.rows else 0
+        left = margin - col if col < 0 else 0
+        right = col - self.cols + 1 + margin if col >= self.cols else 0
+        padding = ((top, bottom), (left, right))
+        self.blocked = np.pad(self.blocked, padding)
+        self.obstacle_count = np.pad(self.obstacle_count, padding)
+        self.rows, self.cols = self.blocked.shape
+        self.origin_x -= left * self.cell_size
+        self.origin_z -= top * self.cell_size
+        if top or left:
+            self.obstacle_cells = {key: (cell_row + top, cell_col + left)
+                                   for key, (cell_row, cell_col) in self.obstacle_cells.items()}
+        self.distance = np.full((self.rows, self.cols), np.inf)
+        self.flow = np.zeros((self.rows, self.cols, 2), dtype=np.float32)
+        self.target_cell = None  # Champ de flux recalculé à la prochaine mise à jour
+
+    def add_obstacle(self, obj):
+        """Bloque la cellule d'un obstacle (la grille s'agrandit s'il est en dehors)"""
+        col = int((obj.x - self.origin_x) // self.cell_size)
+        row = int((obj.z - self.origin_z) // self.cell_size)
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            self._grow(row, col)
+            col = int((obj.x - self.origin_x) // self.cell_size)
+            row = int((obj.z - self.origin_z) // self.cell_size)
+        cell = row, col
+        self.obstacle_cells[id(obj)] = cell
+        self.obstacle_count[cell] += 1
+        self.blocked[cell] = True
+
+    def remove_obstacle(self, obj):
+        """Libère la cellule d'un obstacle si aucun autre ne l'occupe"""
+        cell = self.obstacle_cells.pop(id(obj), None)
+        if cell is not None:
+            self.obstacle_count[cell] -= 1
+            self.blocked[cell] = self.obstacle_count[cell] > 0
+
+    def update_target(self, x, z):
+        """Recalcule le champ de flux seulement si la cible a changé de cellule"""
+        cell = self.cell_of(x, z)
+        if cell == self.target_cell:
+            return False
+        self.target_cell = cell
+        self._compute_distances(cell)
+        self._compute_flow()
+        return True
+
+    def _compute_distances(self, target):
+        """Parcours en largeur depuis la cellule cible (distance en nombre de cellules)"""
+        # Listes Python à plat : bien plus rapides que l'indexation NumPy élément par élément
+        rows, cols = self.rows, self.cols
+        blocked = self.blocked.ravel().tolist()
+        distance = [math.inf] * (rows * cols)
+        start = target[0] * cols + target[1]
+        distance[start] = 0.0
+        queue = deque([start])
+        while queue:
+            index = queue.popleft()
+            next_distance = distance[index] + 1.0
+            col = index % cols
+            neighbors = []
+            if index >= cols:
+                neighbors.append(index - cols)
+            if index < (rows - 1) * cols:
+                neighbors.append(index + cols)
+            if col > 0:
+                neighbors.append(index - 1)
+            if col < cols - 1:
+                neighbors.append(index + 1)
+            for neighbor in neighbors:
+                if not blocked[neighbor] and distance[neighbor] > next_distance:
+                    distance[neighbor] = next_distance
+                    queue.append(neighbor)
+        self.distance = np.array(distance).reshape(rows, cols)
+
+    def _compute_flow(self):
+        """Oriente chaque cellule vers son voisin le plus proche de la cible (vectorisé)
+
+        Un voisin en diagonale n'est retenu que si les deux cellules qu'il longe sont libres :
+        les ennemis ne coupent pas le coin d'un obstacle.
+        """
+        padded = np.pad(self.distance, 1, constant_values=np.inf)
+        padded_blocked = np.pad(self.blocked, 1, constant_values=True)
+
+        def shifted(array, d_row, d_col):
+            return array[1 + d_row:1 + d_row + self.rows, 1 + d_col:1 + d_col + self.cols]
+
+        neighbor_distances = np.stack([
+            np.where(shifted(padded_blocked, d_row, 0) | shifted(padded_blocked, 0, d_col),
+                     np.inf, shifted(padded, d_row, d_col)) if d_row and d_col
+            else shifted(padded, d_row, d_col)
+            for d_row, d_col in NEIGHBOR_OFFSETS
+        ])
+        best = neighbor_distances.argmin(axis=0)
+        offsets = np.array(NEIGHBOR_OFFSETS, dtype=np.float32)
+        directions = offsets[best][..., ::-1]  # (ligne, colonne) -> (x, z)
+        directions /= np.linalg.norm(directions, axis=-1, keepdims=True)
+
+        # Cellules sans chemin : pas de direction, l'ennemi visera le joueur directement
+        unreachable = ~np.isfinite(neighbor_distances.min(axis=0))
+        directions[unreachable] = 0.0
+        self.flow = directions
+
+
+class EnemySystem:
+    """Simule en lot les objets destructibles comme ennemis se dirigeant vers le joueur"""
+    def __init__(self, objects, speed=120.0, activation_radius=1500.0, stop_distance=120.0,
+                 separation_radius=80.0, separation_strength=1.5, cell_size=100):
+        self.speed = speed  # Unités 3D par seconde
+        self.activation_radius = activation_radius  # Les ennemis plus loin restent immobiles
+        self.stop_distance = stop_distance  # Distance à laquelle un ennemi s'arrête devant le joueur
+        self.separation_radius = separation_radius
+        self.separation_strength = separation_strength
+
+        self.grid = NavigationGrid([obj for obj in objects if not obj.destroyable], cell_size)
+        self.enemies = [obj for obj in objects if obj.destroyable]
+        self._rebuild_positions()
+
+    def _rebuild_positions(self):
+        """Reconstruit le tableau des positions (seulement quand la liste d'ennemis change)"""
+        self.positions = np.array([(obj.x, obj.z) for obj in self.enemies], dtype=np.float32).reshape(-1, 2)
+
+    def remove(self, obj):
+        """Retire un ennemi détruit de la simulation"""
+        if obj in self.enemies:
+            self.enemies.remove(obj)
+            self._rebuild_positions()
+
+    def apply_map_changes(self, created, removed, moved):
+        """Applique un rechargement de map (objets créés, retirés, déplacés) sans toucher aux autres ennemis"""
+        grid = self.grid
+        obstacles_changed = False
+        enemies_changed = False
+        removed_enemies = {id(obj) for obj in removed if obj.destroyable}
+        if removed_enemies:
+            self.enemies = [obj for obj in self.enemies if id(obj) not in removed_enemies]
+            enemies_changed = True
+        for obj in removed:
+            if not obj.destroyable:
+                grid.remove_obstacle(obj)
+                obstacles_changed = True
+        for obj in moved:
+            if obj.destroyable:
+                enemies_changed = True
+            else:
+                grid.remove_obstacle(obj)
+                grid.add_obstacle(obj)
+                obstacles_changed = True
+        for obj in created:
+            if obj.destroyable:
+                self.enemies.append(obj)
+                enemies_changed = True
+            else:
+                grid.add_obstacle(obj)
+                obstacles_changed = True
+
+        if obstacles_changed:
+            grid.target_cell = None  # Champ de flux recalculé à la prochaine mise à jour
+        if enemies_changed:
+            self._rebuild_positions()
+
+    def update(self, delta_time, player_x, player_z):
+        """Fait avancer tous les ennemis d'un pas (champ de flux + séparation)"""
+        if not self.enemies:
+            return
+        self.grid.update_target(player_x, player_z)
+
+        positions = self.positions
+        to_player = np.array((player_x, player_z), dtype=np.float32) - positions
+        player_distance = np.linalg.norm(to_player, axis=1)
+        active = (player_distance < self.activation_radius) & (player_distance > self.stop_distance)
+        if not active.any():
+            return
+
+        # Direction lue dans le champ de flux selon la cellule de chaque ennemi
+        grid = self.grid
+        cols = ((positions[:, 0] - grid.origin_x) // grid.cell_size).astype(np.int32).clip(0, grid.cols - 1)
+        rows = ((positions[:, 1] - grid.origin_z) // grid.cell_size).astype(np.int32).clip(0, grid.rows - 1)
+        desired = grid.flow[rows, cols]
+
+        # Proche du joueur ou hors champ : on vise directement le joueur
+        direct = (player_distance < 2 * grid.cell_size) | ~desired.any(axis=1)
+        safe_distance = np.maximum(player_distance, 1e-6)[:, None]
+        desired = np.where(direct[:, None], to_player / safe_distance, desired)
+
+        # Séparation : repousse les ennemis trop proches les uns des autres
+        if len(positions) > 1:
+            desired = desired + self._separation(positions) * self.separation_strength
+
+        length = np.maximum(np.linalg.norm(desired, axis=1), 1e-6)[:, None]
+        step = desired / length * (self.speed * delta_time)
+        positions[active] += step[active]
+
+        for obj, (x, z) in zip(self.enemies, positions.tolist()):
+            obj.x = x
+            obj.z = z
+
+    def _separation(self, positions):
+        """Force de séparation calculée via un hachage spatial trié (pas de comparaison tous-contre-tous)"""
+        radius = self.separation_radius
+        count = len(positions)
+        cells = np.floor(positions / radius).astype(np.int64)
+        keys = cells[:, 0] * SEPARATION_HASH + cells[:, 1]
+        order = np.argsort(keys)
+        sorted_keys = keys[order]
+
+        # Plages des ennemis présents dans les 9 cellules voisines de chaque ennemi
+        neighbor_keys = (cells[:, 0, None] + SEPARATION_CELLS[:, 0]) * SEPARATION_HASH \
+            + cells[:, 1, None] + SEPARATION_CELLS[:, 1]
+        first = np.searchsorted(sorted_keys, neighbor_keys, side='left')
+        last = np.searchsorted(sorted_keys, neighbor_keys, side='right')
+        slots = first[..., None] + np.arange(SEPARATION_NEIGHBORS_PER_CELL)
+        valid = slots < last[..., None]
+        candidates = order[np.minimum(slots, count - 1)]
+
+        delta = positions[:, None, None, :] - positions[candidates]
+        distance = np.sqrt((delta * delta).sum(axis=-1))
+        close = valid & (distance < radius) & (distance > 0)
+        weight = np.where(close, (radius - distance) / (radius * np.maximum(distance, 1e-6)), 0.0)
+        return (delta * weight[..., None]).sum(axis=(1, 2))
@@ -1,31 +1,76 @@
 import pygame
+import argparse
+import queue
+import threading
 from random import randrange
 from time import sleep
 import math
 
 # Imports des modules personnalisés
 from player import Player, Camera, Weapon, Gun, Bow, Inventory
-from world import GameObject
+from world import GameObject, Viewport
+from render_backend import create_backend
+from sprite_resampler import SpriteResampler
+from particles import ParticleSystem
+from enemies import EnemySystem
+from audio import pre_init_mixer
+from environment_audio import EnvironmentAudio
+from input_replay import InputRecorder, InputReplay
+from hot_reload import MapHotReloader
+from game_snapshot import WorldSnapshot, SnapshotBuffer
+from occlusion import OcclusionBuffer
+from sky import Skybox
+from day_night import DayNightCycle
+from shadows import ShadowCache
 from map.map import load_map
+from map.ambience import load_ambience
 
+pre_init_mixer()
 pygame.init()
 
+# Résolutions internes proposées par F3 (le HUD reste toujours à la résolution native)
+RENDER_SCALES = (1.0, 0.75, 0.5)
+
+# Au-delà de cette distance, un objet sort de la mini-map (90 px / 0.08, diagonale comprise)
+MINIMAP_RANGE = 1600
+
 # ========================= CLASSE PRINCIPALE =========================
 
 
 class Game:
     """Classe principale du jeu"""
-    def __init__(self):
-        pygame.display.set_caption("D8 Engine")
-        self.screen = pygame.display.set_mode((1000, 600))
+    def __init__(self, record_path=None, replay_path=None, viewport=None, backend="surface",
+                 simulation_rate=60, render_rate=60, day_length=600.0):
+        self.viewport = viewport or Viewport()
+        # Backend de rendu du monde 3D ; le HUD est dessiné sur self.screen en résolution native
+        self.backend = create_backend(backend, self.viewport, "D8 Engine")
+        self.screen = self.backend.hud
+        # Redimensionnement des sprites sur un pool de threads (inutile si le backend met à l'échelle au dessin)
+        self.resampler = SpriteResampler() if self.backend.resamples_sprites else None
         self.running = True
         self.clock = pygame.time.Clock()
         
+        # Simulation et rendu tournent à leur propre cadence (voir run)
+        self.simulation_rate = simulation_rate
+        self.render_rate = render_rate
+        self.input_queue = queue.Queue()  # (événements, position souris) du thread principal vers la simulation
+        self.snapshots = SnapshotBuffer()  # Instantanés publiés par la simulation pour le rendu
+        
+        # Occlusion : objets visibles et non cachés de la dernière mise à jour, du plus proche au plus loin
+        self.occlusion = OcclusionBuffer()
+        self.drawn_objects = []
+        
+        # Ombres précalculées, ajoutées au pied des objets dans la même liste triée que les sprites
+        self.shadows = ShadowCache()
+        
         # Chargement des images de fond
-        self.background = pygame.image.load("assets/jour.png").convert_alpha()
+        self.sky = Skybox(pygame.image.load("assets/jour.png"), self.viewport.fov)  # Ciel panoramique opaque
         self.ground = pygame.image.load("assets/sol.png").convert_alpha()
         self.crosshair = pygame.image.load("assets/viseur.png").convert_alpha()
         
+        # Cycle jour/nuit (teintes précalculées par tranche de temps)
+        self.day_night = DayNightCycle(day_length)
+        
         # Système de viseur (auto-aim sur l'objet touché)
         self.show_crosshair = False
         self.crosshair_timer = 0.0
@@ -41,18 +86,36 @@ class Game:
         self.kill_count = 0
         
         # Initialisation de la caméra et du joueur
-        self.camera = Camera()
-        self.player = Player()
+        self.camera = Camera(self.viewport)
+        self.player = Player(self.viewport)
         
         # Initialisation de l'inventaire
-        self.inventory = Inventory()
-        self.inventory.add_weapon(Gun())
-        self.inventory.add_weapon(Bow())
+        self.inventory = Inventory(self.viewport)
+        self.inventory.add_weapon(Gun(self.viewport))
+        self.inventory.add_weapon(Bow(self.viewport))
         self.inventory.current_weapon_index = 1  # Commence avec l'arc
         
+        # Enregistrement / relecture des entrées (la graine rend les particules reproductibles)
+        self.replay = InputReplay(replay_path) if replay_path else None
+        seed = self.replay.seed if self.replay else randrange(2 ** 32)
+        self.recorder = InputRecorder(record_path, seed) if record_path else None
+        
+        # Particules d'impact et de tir
+        self.particles = ParticleSystem(seed=seed, output_slots=SnapshotBuffer.SLOTS)
+        
         # Chargement de la map depuis le fichier externe
         self.objects = load_map()
         
+        # Les objets destructibles (statues) se dirigent vers le joueur
+        self.enemies = EnemySystem(self.objects)
+        
+        # Ambiances de zones et sons positionnels de la map
+        emitters, zones = load_ambience()
+        self.environment_audio = EnvironmentAudio(emitters, zones)
+        
+        # Rechargement à chaud des modifications de map exportées par l'éditeur (désactivé en relecture)
+        self.map_reloader = None if self.replay else MapHotReloader("map/map.py")
+        
         print("MOTEUR DE JEU LANCÉ")
         print("Contrôles:")
         print("  W/S - Avancer/Reculer")
@@ -61,42 +124,48 @@ class Game:
         print("  ESPACE - Sauter")
         print("  HAUT/BAS - Changer d'arme")
         print("  CLIC - Tirer (pistolet)")
+        print("  F3 - Résolution interne du rendu")
         print("\n🎮 Système 3D avec coordonnées X, Y, Z activé!")
         
-    def handle_events(self):
+    def handle_events(self, events):
         """Gère les événements"""
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 self.running = False
-                pygame.quit()
                 
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 weapon = self.inventory.get_current_weapon()
                 if isinstance(weapon, Gun):
                     if weapon.fire():
+                        self.emit_muzzle_flash()
                         # Vérifie si un objet destructible est dans la zone de visée
                         for obj in self.objects:
-                            if obj.destroyable and obj.is_in_crosshair():
-                                # Affiche le viseur sur l'objet touché
+                            if obj.destroyable and obj.is_in_crosshair(self.viewport.center_x, self.viewport.center_y):
+                                # Affiche le viseur sur l'objet touché (centre de l'objet affiché)
                                 self.show_crosshair = True
                                 self.crosshair_timer = 0.0
-                                self.crosshair_target_x = obj.screen_x
+                                self.crosshair_target_x, self.crosshair_target_y = obj.get_aim_point(self.camera.ground_y)
                                 
-                                # Calcul correct de la position Y du viseur (centre de l'objet affiché)
-                                img_height = obj.image.get_height()
-                                factor = 0.4 if obj.original_height > 400 else 0.25
-                                ground_anchor_offset = 40 + (img_height * factor)
-                                # Position Y du centre de l'objet affiché
-                                self.crosshair_target_y = obj.screen_y - (img_height // 2) + ground_anchor_offset + self.camera.ground_y
+                                # Gerbe de débris au point d'impact
+                                self.particles.emit(obj.x, obj.y + obj.original_height * 0.3, obj.z,
+                                                    count=120, color=(170, 160, 140), speed=300.0, lifetime=0.9)
                                 
                                 # Détruit l'objet (le retire de la liste)
                                 self.objects.remove(obj)
+                                self.enemies.remove(obj)
+                                if self.map_reloader:
+                                    self.map_reloader.mark_destroyed(obj)
                                 self.kill_count += 1  # Increment kill counter
                                 break  # Ne détruit qu'un seul objet par tir
                     
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     self.paused = not self.paused  # Toggle pause
+                elif event.key == pygame.K_F3:
+                    # Cycle internal render resolution (the backend follows when it draws the next snapshot)
+                    current = RENDER_SCALES.index(self.viewport.render_scale) if self.viewport.render_scale in RENDER_SCALES else -1
+                    self.viewport.set_render_scale(RENDER_SCALES[(current + 1) % len(RENDER_SCALES)])
+                    print(f"Render scale: {self.viewport.render_scale:.0%}")
                 elif event.key == pygame.K_DOWN:
                     self.inventory.switch_to_next()
                 elif event.key == pygame.K_r:
@@ -135,12 +204,35 @@ class Game:
                 elif event.key == pygame.K_LSHIFT or event.key == pygame.K_RSHIFT:
                     self.camera.stop_crouch()
                     
-    def update(self, delta_time):
+    def emit_muzzle_flash(self):
+        """Émet quelques étincelles devant le joueur au moment du tir"""
+        forward_x = -math.sin(self.player.angle)
+        forward_z = math.cos(self.player.angle)
+        self.particles.emit(self.player.x + forward_x * 40, self.player.y - 20, self.player.z + forward_z * 40,
+                            count=16, color=(255, 210, 90), speed=120.0, lifetime=0.12,
+                            spread=0.4, direction=(forward_x, 0.3, forward_z))
+                    
+    def apply_map_reload(self):
+        """Applique les changements du fichier de map sans toucher au joueur ni aux images chargées"""
+        changes = self.map_reloader.poll(self.objects)
+        if changes is None:
+            return
+        created, removed, moved = changes
+        if removed:
+            removed_ids = {id(obj) for obj in removed}
+            self.objects = [obj for obj in self.objects if id(obj) not in removed_ids]
+        self.objects.extend(created)
+        if created or removed or moved:
+            # Seuls les ennemis et obstacles concernés changent (les autres ennemis gardent leur état)
+            self.enemies.apply_map_changes(created, removed, moved)
+            print(f"Map reloaded: +{len(created)} -{len(removed)} ~{len(moved)}")
+                    
+    def update(self, delta_time, mouse_pos):
         """Met à jour le jeu"""
         if self.paused:
             return  # Don't update when paused
         
-        mouse_x, mouse_y = pygame.mouse.get_pos()
+        mouse_x, mouse_y = mouse_pos
         
         # IMPORTANT: Mise à jour de l'angle AVANT le mouvement du joueur
         self.player.update_head_rotation(mouse_x)
@@ -153,6 +245,9 @@ class Game:
         # Update stamina
         self.player.update_stamina(delta_time, is_moving)
         
+        # Déplacement des ennemis vers le joueur
+        self.enemies.update(delta_time, self.player.x, self.player.z)
+        
         # Check collisions with objects
         self.player.check_collision(self.objects)
         
@@ -161,9 +256,8 @@ class Game:
         self.camera.update_jump(delta_time)
         self.camera.update_crouch(delta_time)  # Anime l'accroupissement
         
-        # Animation de balancement pendant le sprint
+        # Animation de balancement pendant le sprint (ajoutée au sol dans l'instantané)
         self.head_bob_offset = self.camera.update_head_bob(delta_time, is_moving, self.player.is_sprinting)
-        self.camera.ground_y += self.head_bob_offset
         
         # Mise à jour de l'arme actuelle
         current_weapon = self.inventory.get_current_weapon()
@@ -182,70 +276,150 @@ class Game:
                 self.show_crosshair = False
                 self.crosshair_timer = 0.0
         
-        # Mise à jour de la projection des objets 3D
+        # Mise à jour de l'audio d'environnement (atténuation et panoramique)
+        self.environment_audio.update(self.player.x, self.player.z, self.player.angle)
+        
+        # Mise à jour des particules
+        self.particles.update(delta_time)
+        
+        # Heure de la journée (les teintes ne changent qu'au passage d'une tranche de temps)
+        self.day_night.update(delta_time)
+        
+        # Mise à jour de la projection des objets 3D (sans redimensionner : l'occlusion décide d'abord)
+        player = self.player
+        visible = []
         for obj in self.objects:
-            obj.update_projection(self.player.x, self.player.y, self.player.z, self.player.angle)
+            obj.update_projection(player.x, player.y, player.z, player.angle, self.viewport, resample=False)
+            if obj.visible:
+                visible.append(obj)
+        
+        # Passe d'occlusion du plus proche au plus loin : les objets cachés ne sont ni redimensionnés ni dessinés
+        visible.sort(key=lambda obj: obj.get_distance_squared(player.x, player.y, player.z))
+        self.drawn_objects = self.occlusion.cull(visible, self.camera.ground_y + self.head_bob_offset, self.viewport)
+        
+        # Images redimensionnées et teintées des objets restants (en arrière-plan avec le resampler)
+        if self.backend.resamples_sprites:
+            if self.resampler:
+                self.resampler.begin_frame()
+            sprite_tint = self.day_night.lighting[2]
+            for obj in self.drawn_objects:
+                obj.update_image(self.resampler, sprite_tint)
             
-    def draw(self):
-        """Dessine tous les éléments"""
-        # Fond
-        self.screen.blit(self.background, (0, 0))
-        
-        # Sol
-        self.screen.blit(self.ground, (0, self.camera.ground_y))
+    def take_snapshot(self):
+        """Fige l'état nécessaire au rendu après une mise à jour (thread de simulation)"""
+        player = self.player
+        ground_y = self.camera.ground_y + self.head_bob_offset
+        
+        # Objets non cachés par l'occlusion, dessinés du plus loin au plus proche, chacun précédé de son ombre
+        sprites = []
+        for obj in reversed(self.drawn_objects):
+            rect = obj.get_draw_rect(ground_y, self.viewport)
+            prototype = obj.prototype
+            if prototype.casts_shadow and obj.footprint and obj.display_scale >= prototype.shadow_scale:
+                sprites.append(self.shadows.place(obj.footprint, rect))
+            sprites.append((obj.image, obj.original_image, rect))
+        
+        # Particules dans les tampons de l'emplacement de l'instantané, cachées par les objets opaques plus proches
+        particles = self.particles.project(player.x, player.y, player.z, player.angle, ground_y, self.viewport,
+                                           self.occlusion, self.snapshots.back_slot())
+        
+        # Arme (pendant l'animation de changement, celle qui sort ou qui entre)
+        animation = self.inventory.switching_animation
+        if not animation['active']:
+            weapon = self.inventory.get_current_weapon()
+        elif animation['phase'] == 'down':
+            weapon = animation['from_weapon']
+        else:
+            weapon = animation['to_weapon']
         
-        # Trie les objets par distance au carré (plus rapide, même ordre)
-        sorted_objects = sorted(
-            self.objects, 
-            key=lambda obj: obj.get_distance_squared(self.player.x, self.player.y, self.player.z),
-            reverse=True
+        current_weapon = self.inventory.get_current_weapon()
+        ammo = None
+        if isinstance(current_weapon, Gun):
+            reload_progress = (current_weapon.reload_timer / current_weapon.reload_duration) * 100
+            ammo = (current_weapon.is_reloading, reload_progress, current_weapon.munitions, current_weapon.reserve_ammo)
+        
+        minimap_objects = tuple((obj.x, obj.z, obj.destroyable) for obj in self.objects
+                                if abs(obj.x - player.x) < MINIMAP_RANGE and abs(obj.z - player.z) < MINIMAP_RANGE)
+        
+        return WorldSnapshot(
+            player_position=(player.x, player.y, player.z),
+            player_angle=player.angle,
+            player_speed=(player.speed_forward, player.speed_strafe),
+            stamina_ratio=player.stamina / player.max_stamina,
+            ground_y=ground_y,
+            render_scale=self.viewport.render_scale,
+            lighting=self.day_night.lighting,
+            sprites=tuple(sprites),
+            particles=particles,
+            weapon_sprite=weapon.get_sprite() if weapon else None,
+            crosshair=(self.crosshair_target_x, self.crosshair_target_y) if self.show_crosshair else None,
+            ammo=ammo,
+            kill_count=self.kill_count,
+            paused=self.paused,
+            minimap_objects=minimap_objects,
         )
+            
+    def draw(self, snapshot=None):
+        """Dessine tous les éléments d'un instantané (par défaut, l'état actuel du jeu)"""
+        if snapshot is None:
+            snapshot = self.take_snapshot()
+        
+        # Le monde 3D est dessiné par le backend, à la résolution interne de l'instantané
+        if snapshot.render_scale != self.backend.viewport.render_scale:
+            self.backend.set_render_scale(snapshot.render_scale)
+        self.backend.begin_world()
+        
+        sky_tint, ground_tint, sprite_tint = snapshot.lighting
+        
+        # Ciel (défile avec l'angle de la caméra)
+        self.backend.draw_sky(self.sky, snapshot.player_angle, sky_tint)
+        
+        # Sol
+        self.backend.draw_backdrop(self.ground, snapshot.ground_y, ground_tint)
         
         # Dessine les objets du décor dans l'ordre de profondeur
-        for obj in sorted_objects:
-            obj.draw(self.screen, self.camera.ground_y)
+        self.backend.draw_sprites(snapshot.sprites, sprite_tint)
+        
+        # Particules (débris et étincelles)
+        self.backend.draw_particles(snapshot.particles)
+        
+        # Agrandissement unique vers l'écran ; le HUD est dessiné ensuite en résolution native
+        self.backend.end_world()
         
         # Arme (toujours au premier plan)
-        if not self.inventory.switching_animation['active']:
-            current_weapon = self.inventory.get_current_weapon()
-            if current_weapon:
-                current_weapon.draw(self.screen)
-        else:
-            # Pendant l'animation, on dessine l'arme qui sort
-            if self.inventory.switching_animation['phase'] == 'down':
-                self.inventory.switching_animation['from_weapon'].draw(self.screen)
-            else:
-                self.inventory.switching_animation['to_weapon'].draw(self.screen)
+        if snapshot.weapon_sprite:
+            self.screen.blit(*snapshot.weapon_sprite)
         
         # Viseur (affiché pendant 0.3s sur l'objet touché - auto-aim)
-        if self.show_crosshair:
-            crosshair_x = self.crosshair_target_x - self.crosshair.get_width() // 2
-            crosshair_y = self.crosshair_target_y - self.crosshair.get_height() // 2
+        if snapshot.crosshair:
+            crosshair_x = snapshot.crosshair[0] - self.crosshair.get_width() // 2
+            crosshair_y = snapshot.crosshair[1] - self.crosshair.get_height() // 2
             self.screen.blit(self.crosshair, (crosshair_x, crosshair_y))
         
         # Affichage des infos de débogage
+        player_x, player_y, player_z = snapshot.player_position
+        speed_forward, speed_strafe = snapshot.player_speed
         font = pygame.font.Font(None, 24)
-        pos_text = font.render(f"Position: X={self.player.x:.1f} Y={self.player.y:.1f} Z={self.player.z:.1f}", True, (255, 255, 255))
-        angle_text = font.render(f"Angle: {math.degrees(self.player.angle):.1f}°", True, (255, 255, 255))
-        speed_text = font.render(f"Vitesse: Av={self.player.speed_forward:.2f} Lat={self.player.speed_strafe:.2f}", True, (255, 255, 255))
+        pos_text = font.render(f"Position: X={player_x:.1f} Y={player_y:.1f} Z={player_z:.1f}", True, (255, 255, 255))
+        angle_text = font.render(f"Angle: {math.degrees(snapshot.player_angle):.1f}°", True, (255, 255, 255))
+        speed_text = font.render(f"Vitesse: Av={speed_forward:.2f} Lat={speed_strafe:.2f}", True, (255, 255, 255))
         self.screen.blit(pos_text, (10, 10))
         self.screen.blit(angle_text, (10, 35))
         self.screen.blit(speed_text, (10, 60))
         
         # Affichage des munitions pour le pistolet
-        current_weapon = self.inventory.get_current_weapon()
-        if isinstance(current_weapon, Gun):
-            if current_weapon.is_reloading:
-                reload_progress = (current_weapon.reload_timer / current_weapon.reload_duration) * 100
+        if snapshot.ammo:
+            is_reloading, reload_progress, munitions, reserve_ammo = snapshot.ammo
+            if is_reloading:
                 ammo_text = font.render(f"Reloading... {reload_progress:.0f}%", True, (255, 255, 0))
             else:
-                ammo_text = font.render(f"Ammo: {current_weapon.munitions}/{current_weapon.reserve_ammo}", True, (255, 255, 255))
+                ammo_text = font.render(f"Ammo: {munitions}/{reserve_ammo}", True, (255, 255, 255))
             self.screen.blit(ammo_text, (10, 85))
         
         # Stamina bar
         stamina_bar_width = 200
         stamina_bar_height = 20
-        stamina_percent = self.player.stamina / self.player.max_stamina
+        stamina_percent = snapshot.stamina_ratio
         pygame.draw.rect(self.screen, (50, 50, 50), (10, 110, stamina_bar_width, stamina_bar_height))
         pygame.draw.rect(self.screen, (0, 200, 255), (10, 110, int(stamina_bar_width * stamina_percent), stamina_bar_height))
         pygame.draw.rect(self.screen, (255, 255, 255), (10, 110, stamina_bar_width, stamina_bar_height), 2)
@@ -253,38 +427,32 @@ class Game:
         self.screen.blit(stamina_text, (220, 110))
         
         # Kill counter
-        kill_text = font.render(f"Kills: {self.kill_count}", True, (255, 255, 100))
+        kill_text = font.render(f"Kills: {snapshot.kill_count}", True, (255, 255, 100))
         self.screen.blit(kill_text, (10, 140))
         
         # Pause menu overlay
-        if self.paused:
-            overlay = pygame.Surface((1000, 600))
-            overlay.set_alpha(180)
-            overlay.fill((0, 0, 0))
-            self.screen.blit(overlay, (0, 0))
+        if snapshot.paused:
+            self.backend.dim(180)
             
             pause_font = pygame.font.Font(None, 72)
             pause_text = pause_font.render("PAUSED", True, (255, 255, 255))
-            pause_rect = pause_text.get_rect(center=(500, 250))
+            pause_rect = pause_text.get_rect(center=(self.viewport.center_x, self.viewport.center_y - 50))
             self.screen.blit(pause_text, pause_rect)
             
             info_font = pygame.font.Font(None, 32)
             info_text = info_font.render("Press ESC to resume", True, (200, 200, 200))
-            info_rect = info_text.get_rect(center=(500, 330))
+            info_rect = info_text.get_rect(center=(self.viewport.center_x, self.viewport.center_y + 30))
             self.screen.blit(info_text, info_rect)
         
         # Mini-map (top-right corner)
-        self.draw_minimap()
+        self.draw_minimap(snapshot)
         
-        # Restaure le ground_y original après le rendu
-        self.camera.ground_y -= self.head_bob_offset
-        
-        pygame.display.flip()
+        self.backend.present()
     
-    def draw_minimap(self):
+    def draw_minimap(self, snapshot):
         """Draw a mini-map in the top-right corner"""
         minimap_size = 180
-        minimap_x = 1000 - minimap_size - 10
+        minimap_x = self.viewport.width - minimap_size - 10
         minimap_y = 10
         minimap_scale = 0.08  # Scale factor for world to minimap
         
@@ -296,14 +464,16 @@ class Game:
         center_x = minimap_x + minimap_size // 2
         center_y = minimap_y + minimap_size // 2
         
+        # Rotate relative to player angle
+        player_x, _, player_z = snapshot.player_position
+        cos_a = math.cos(-snapshot.player_angle)
+        sin_a = math.sin(-snapshot.player_angle)
+        
         # Draw objects
-        for obj in self.objects:
-            rel_x = (obj.x - self.player.x) * minimap_scale
-            rel_z = (obj.z - self.player.z) * minimap_scale
+        for obj_x, obj_z, destroyable in snapshot.minimap_objects:
+            rel_x = (obj_x - player_x) * minimap_scale
+            rel_z = (obj_z - player_z) * minimap_scale
             
-            # Rotate relative to player angle
-            cos_a = math.cos(-self.player.angle)
-            sin_a = math.sin(-self.player.angle)
             rotated_x = rel_x * cos_a - rel_z * sin_a
             rotated_z = rel_x * sin_a + rel_z * cos_a
             
@@ -312,7 +482,7 @@ class Game:
             
             # Only draw if within minimap bounds
             if minimap_x < map_x < minimap_x + minimap_size and minimap_y < map_y < minimap_y + minimap_size:
-                color = (255, 100, 100) if obj.destroyable else (100, 255, 100)
+                color = (255, 100, 100) if destroyable else (100, 255, 100)
                 pygame.draw.circle(self.screen, color, (map_x, map_y), 3)
         
         # Draw player (center, facing up)
@@ -328,19 +498,97 @@ class Game:
         label_text = label_font.render("Mini-Map", True, (255, 255, 255))
         self.screen.blit(label_text, (minimap_x + 5, minimap_y + minimap_size + 5))
         
-    def run(self):
-        """Boucle principale du jeu"""
+    def simulation_loop(self, mouse_pos):
+        """Boucle de simulation (thread dédié) : consomme les entrées et publie un instantané par tick"""
+        clock = pygame.time.Clock()
         while self.running:
+            frame_ms = clock.tick(self.simulation_rate)
+            
+            # Toutes les entrées reçues depuis le tick précédent
+            events = []
+            while True:
+                try:
+                    frame_events, mouse_pos = self.input_queue.get_nowait()
+                except queue.Empty:
+                    break
+                events.extend(frame_events)
+            
+            # En relecture, les entrées et la durée de frame viennent de l'enregistrement (lockstep)
+            if self.replay:
+                frame = self.replay.next_frame()
+                if frame is None:
+                    print(f"Replay finished ({self.replay.frame_index} frames)")
+                    self.running = False
+                    break
+                quit_events = [event for event in events if event.type == pygame.QUIT]
+                frame_ms, mouse_pos, events = frame
+                events += quit_events
+            
             # Calcule le temps écoulé depuis la dernière frame (en secondes)
-            delta_time = self.clock.tick(60) / 1000.0  # Convertit ms en secondes
+            delta_time = frame_ms / 1000.0  # Convertit ms en secondes
             
-            self.handle_events()
-            self.update(delta_time)
-            self.draw()
+            self.handle_events(events)
+            if not self.running:
+                break
+            if self.map_reloader:
+                self.apply_map_reload()
+            # Seules les frames réellement simulées sont enregistrées
+            if self.recorder:
+                self.recorder.record(frame_ms, mouse_pos, events)
+            self.update(delta_time, mouse_pos)
+            self.snapshots.publish(self.take_snapshot())
+        
+    def run(self):
+        """Boucle principale du jeu
+        
+        La simulation tourne sur son propre thread ; le thread principal garde les entrées
+        (SDL ne les lit que sur le thread de la fenêtre) et dessine le dernier instantané publié.
+        """
+        simulation = threading.Thread(target=self.simulation_loop, args=(pygame.mouse.get_pos(),),
+                                      name="simulation", daemon=True)
+        simulation.start()
+        
+        drawn_sequence = 0
+        while self.running and simulation.is_alive():
+            self.clock.tick(self.render_rate)
+            events = pygame.event.get()
+            self.input_queue.put((events, pygame.mouse.get_pos()))
+            
+            # Ne redessine que si la simulation a publié un nouvel état
+            snapshot, sequence = self.snapshots.latest()
+            if sequence != drawn_sequence:
+                drawn_sequence = sequence
+                self.draw(snapshot)
+        
+        self.running = False
+        simulation.join()
+        if self.recorder:
+            self.recorder.close()
+        if self.resampler:
+            self.resampler.shutdown()
+        pygame.quit()
 
 
 # ========================= LANCEMENT DU JEU =========================
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="D8 Engine")
+    parser.add_argument("--record", metavar="FILE", help="Enregistre les entrées dans FILE")
+    parser.add_argument("--replay", metavar="FILE", help="Rejoue les entrées enregistrées dans FILE")
+    parser.add_argument("--width", type=int, default=1000, help="Largeur de la fenêtre")
+    parser.add_argument("--height", type=int, default=600, help="Hauteur de la fenêtre")
+    parser.add_argument("--fov", type=float, default=90.0, help="Champ de vision horizontal en degrés")
+    parser.add_argument("--render-scale", type=float, default=1.0,
+                        help="Résolution interne du rendu 3D (ex: 0.5 pour la moitié)")
+    parser.add_argument("--backend", choices=("surface", "sdl2"), default="surface",
+                        help="Backend de rendu (sdl2 : textures mises à l'échelle au dessin)")
+    parser.add_argument("--tick-rate", type=int, default=60, help="Fréquence de la simulation (ticks par seconde)")
+    parser.add_argument("--fps", type=int, default=60, help="Images par seconde maximum du rendu")
+    parser.add_argument("--day-length", type=float, default=600.0,
+                        help="Durée d'une journée en secondes (0 : heure figée)")
+    args = parser.parse_args()
+    
+    viewport = Viewport(args.width, args.height, args.fov, args.render_scale)
+    game = Game(record_path=args.record, replay_path=args.replay, viewport=viewport, backend=args.backend,
+                simulation_rate=args.tick_rate, render_rate=args.fps, day_length=args.day_length)
     game.run()
@@ -0,0 +1,131 @@
+"""Module contenant l'audio d'environnement : zones d'ambiance et sons positionnels 3D"""
+import math
+from audio import get_audio_manager, PRIORITY_AMBIENT
+from world import rotate_point_y
+
+
+class SoundEmitter:
+    """Son attaché à une position du monde, audible dans un rayon donné"""
+    def __init__(self, sound_path, x, z, radius=800.0, volume=1.0):
+        self.sound_path = sound_path
+        self.x = x
+        self.z = z
+        self.radius = radius
+        self.volume = volume
+
+
+class AudioZone:
+    """Zone rectangulaire jouant une ambiance en boucle tant que le joueur s'y trouve"""
+    def __init__(self, sound_path, x1, z1, x2, z2, volume=0.6):
+        self.sound_path = sound_path
+        self.min_x, self.max_x = min(x1, x2), max(x1, x2)
+        self.min_z, self.max_z = min(z1, z2), max(z1, z2)
+        self.volume = volume
+
+    def contains(self, x, z):
+        return self.min_x <= x <= self.max_x and self.min_z <= z <= self.max_z
+
+
+class EnvironmentAudio:
+    """Calcule atténuation et panoramique des seuls émetteurs proches, trouvés via une grille de zones"""
+    def __init__(self, emitters=(), zones=(), cell_size=500.0, max_voices=6):
+        self.cell_size = cell_size
+        self.max_voices = max_voices  # Nombre max d'émetteurs joués simultanément
+        self.emitters = list(emitters)
+        self.zones = list(zones)
+        self.audio = get_audio_manager()
+
+        # Grille pré-calculée : cellule -> émetteurs dont le rayon touche la cellule
+        self.emitter_grid = {}
+        for emitter in self.emitters:
+            self.audio.load(emitter.sound_path)
+            for cell in self._cells_in_rect(emitter.x - emitter.radius, emitter.z - emitter.radius,
+                                            emitter.x + emitter.radius, emitter.z + emitter.radius):
+                self.emitter_grid.setdefault(cell, []).append(emitter)
+
+        # Grille pré-calculée : cellule -> zones qui la recouvrent
+        self.zone_grid = {}
+        for zone in self.zones:
+            self.audio.load(zone.sound_path)
+            for cell in self._cells_in_rect(zone.min_x, zone.min_z, zone.max_x, zone.max_z):
+                self.zone_grid.setdefault(cell, []).append(zone)
+
+        self.playing = {}  # Émetteur -> (voix, instant de départ) pour détecter les voix volées
+        self.current_zone = None
+        self.zone_voice = None
+
+    def _cell_of(self, x, z):
+        return int(x // self.cell_size), int(z // self.cell_size)
+
+    def _cells_in_rect(self, min_x, min_z, max_x, max_z):
+        """Liste les cellules recouvertes par un rectangle du monde"""
+        first_col, first_row = self._cell_of(min_x, min_z)
+        last_col, last_row = self._cell_of(max_x, max_z)
+        return [(col, row) for col in range(first_col, last_col + 1) for row in range(first_row, last_row + 1)]
+
+    def _owns_voice(self, voice, start):
+        """Vérifie que la voix n'a pas été volée par un autre son"""
+        return voice is not None and self.audio.voice_start[voice] == start
+
+    def update(self, player_x, player_z, player_angle):
+        """Met à jour les voix d'ambiance selon la position et l'orientation du joueur"""
+        cell = self._cell_of(player_x, player_z)
+        self._update_zone(cell, player_x, player_z)
+
+        # Émetteurs audibles de la cellule du joueur, les plus proches d'abord
+        audible = []
+        for emitter in self.emitter_grid.get(cell, ()):
+            dx = emitter.x - player_x
+            dz = emitter.z - player_z
+            distance = math.sqrt(dx * dx + dz * dz)
+            if distance < emitter.radius:
+                audible.append((distance, id(emitter), emitter, dx, dz))
+        audible.sort()
+        audible = audible[:self.max_voices]
+        kept = {entry[2] for entry in audible}
+
+        # Arrête les émetteurs devenus inaudibles
+        for emitter in list(self.playing):
+            if emitter not in kept:
+                voice, start = self.playing.pop(emitter)
+                if self._owns_voice(voice, start):
+                    self.audio.stop(voice)
+
+        for distance, _, emitter, dx, dz in audible:
+            voice, start = self.playing.get(emitter, (None, None))
+            if not self._owns_voice(voice, start):
+                voice = self.audio.play(emitter.sound_path, priority=PRIORITY_AMBIENT, volume=0.0, loops=-1)
+                if voice is None:
+                    self.playing.pop(emitter, None)
+                    continue
+                self.playing[emitter] = (voice, self.audio.voice_start[voice])
+
+            # Atténuation quadratique et panoramique à puissance constante
+            gain = emitter.volume * (1.0 - distance / emitter.radius) ** 2
+            rotated_x, _ = rotate_point_y(dx, dz, -player_angle)
+            pan = max(-1.0, min(1.0, rotated_x / distance)) if distance > 0 else 0.0
+            pan_angle = (pan + 1.0) * math.pi / 4
+            self.audio.set_voice_volume(voice, gain * math.cos(pan_angle), gain * math.sin(pan_angle))
+
+    def _update_zone(self, cell, player_x, player_z):
+        """Change l'ambiance de zone quand le joueur entre dans une autre zone, ou la relance si sa voix a été volée"""
+        zone = None
+        for candidate in self.zone_grid.get(cell, ()):
+            if candidate.contains(player_x, player_z):
+                zone = candidate
+                break
+
+        if zone is not self.current_zone:
+            if self.zone_voice is not None and self._owns_voice(*self.zone_voice):
+                self.audio.stop(self.zone_voice[0])
+            self.zone_voice = None
+            self.current_zone = zone
+        elif self.zone_voice is not None and self._owns_voice(*self.zone_voice):
+            return
+
+        # Nouvelle zone, ou voix prise par un son plus prioritaire (redemandée jusqu'à ce qu'une se libère)
+        self.zone_voice = None
+        if zone is not None:
+            voice = self.audio.play(zone.sound_path, priority=PRIORITY_AMBIENT, volume=zone.volume, loops=-1)
+            if voice is not None:
+                self.zone_voice = (voice, self.audio.voice_start[voice])
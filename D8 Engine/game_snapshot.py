@@ -0,0 +1,59 @@
+"""Module contenant l'état du jeu publié par la simulation pour le thread de rendu"""
+import threading
+from collections import namedtuple
+
+
+# Instantané immuable d'une frame : tout ce dont le rendu a besoin, rien de modifiable par la simulation
+WorldSnapshot = namedtuple("WorldSnapshot", [
+    "player_position",  # (x, y, z)
+    "player_angle",
+    "player_speed",  # (avant, latéral)
+    "stamina_ratio",
+    "ground_y",  # Hauteur du sol à l'écran, balancement de tête inclus
+    "render_scale",  # Résolution interne avec laquelle les tailles et rectangles ont été calculés
+    "lighting",  # Teintes (ciel, sol, objets) du cycle jour/nuit
+    "sprites",  # ((image redimensionnée, image d'origine, rectangle), ...) du plus loin au plus proche, ombres comprises
+    "particles",  # Particules projetées (x, y, couleurs) ou None, dans les tampons de l'emplacement de l'instantané
+    "weapon_sprite",  # (image, position) ou None
+    "crosshair",  # Position (x, y) du viseur ou None
+    "ammo",  # (en rechargement, progression %, munitions, réserve) ou None
+    "kill_count",
+    "paused",
+    "minimap_objects",  # ((x, z, destructible), ...)
+])
+
+
+class SnapshotBuffer:
+    """Triple tampon d'instantanés : la simulation remplit un emplacement ni publié ni en cours de dessin
+
+    Les tampons réutilisés d'une frame à l'autre (ex: particules projetées) sont indexés par
+    emplacement : ceux de l'instantané que le rendu dessine ne sont jamais réécrits.
+    """
+    SLOTS = 3
+
+    def __init__(self):
+        self.slots = [None] * self.SLOTS
+        self.front = 0  # Dernier instantané publié
+        self.reading = 0  # Instantané pris par le rendu (dessiné jusqu'à son prochain appel à latest)
+        self.back = 1
+        self.sequence = 0  # Numéro du dernier instantané publié
+        self.lock = threading.Lock()
+
+    def back_slot(self):
+        """Choisit et retourne l'emplacement que la simulation peut remplir"""
+        with self.lock:
+            self.back = next(slot for slot in range(self.SLOTS) if slot not in (self.front, self.reading))
+            return self.back
+
+    def publish(self, snapshot):
+        """Publie l'instantané construit dans l'emplacement choisi par back_slot"""
+        self.slots[self.back] = snapshot
+        with self.lock:
+            self.front = self.back
+            self.sequence += 1
+
+    def latest(self):
+        """Retourne (instantané, numéro) du dernier état publié"""
+        with self.lock:
+            self.reading = self.front
+            return self.slots[self.front], self.sequence
@@ -0,0 +1,127 @@
+"""Module contenant le rechargement à chaud de la map dans une partie en cours"""
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+import pygame
+from map_io import iter_map_objects
+from world import GameObject
+
+
+class MapHotReloader:
+    """Surveille le fichier de map et calcule les changements à appliquer au monde en cours
+
+    La lecture du fichier et la comparaison des clés se font sur un thread de travail ; le
+    thread de simulation n'applique que la liste des changements obtenue.
+    """
+    def __init__(self, path="map/map.py", interval=0.2):
+        self.path = path
+        self.interval = interval  # Secondes entre deux vérifications (un simple os.stat)
+        self.last_mtime = self._mtime()
+        self.next_check = 0.0
+        self.destroyed_keys = Counter()  # Objets détruits en jeu : ils ne réapparaissent pas au rechargement
+        self.destroyed_during_diff = set()  # id des objets détruits pendant que le thread compare
+        self.thread = None
+        self.result = None  # (clés à créer, objets retirés, (objet, nouvelle clé) déplacés), posé par le thread
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def busy(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def mark_destroyed(self, obj):
+        self.destroyed_keys[obj.map_key] += 1
+        self.destroyed_during_diff.add(id(obj))
+
+    def poll(self, objects):
+        """Retourne (créés, retirés, déplacés) quand une comparaison lancée plus tôt est terminée, sinon None
+
+        Lance la comparaison en arrière-plan si le fichier a changé depuis la dernière vérification.
+        """
+        if self.result is not None and not self.busy():
+            result = self.result
+            self.result = None
+            return self._apply(*result)
+
+        now = time.perf_counter()
+        if now < self.next_check or self.busy():
+            return None
+        self.next_check = now + self.interval
+
+        mtime = self._mtime()
+        if mtime is None or mtime == self.last_mtime:
+            return None
+        self.last_mtime = mtime
+        self.destroyed_during_diff = set()
+        # Copies pour le thread : la liste est copiée en C, les clés de map des objets ne changent pas ici
+        self.thread = threading.Thread(target=self._diff_worker, args=(tuple(objects), Counter(self.destroyed_keys)),
+                                       daemon=True)
+        self.thread.start()
+        return None
+
+    def _diff_worker(self, objects, destroyed_keys):
+        try:
+            self.result = self.diff(objects, destroyed_keys)
+        except (OSError, ValueError) as error:
+            print(f"Hot reload: cannot read {self.path} ({error})")
+
+    def diff(self, objects, destroyed_keys):
+        """Compare le fichier de map aux objets du monde, identifiés par leur clé de map d'origine
+
+        Ne modifie aucun objet (appelé sur le thread de travail) : retourne les clés à créer, les
+        objets en trop et les couples (objet, clé) des objets réutilisés comme déplacements.
+        """
+        wanted = Counter((obj['texture'], obj['x'], obj['y'], obj['z'], obj['destroyable'], obj['yaw'])
+                         for obj in iter_map_objects(self.path))
+        wanted -= destroyed_keys
+
+        current = defaultdict(list)
+        for obj in objects:
+            current[obj.map_key].append(obj)
+
+        # Objets en trop, regroupés par (texture, destructible) pour être réutilisés comme déplacements
+        spare = defaultdict(list)
+        for key, instances in current.items():
+            extra = len(instances) - wanted.get(key, 0)
+            if extra > 0:
+                spare[(key[0], key[4])].extend(instances[-extra:])
+
+        created = []
+        moved = []
+        for key, count in wanted.items():
+            for _ in range(count - len(current.get(key, ()))):
+                candidates = spare.get((key[0], key[4]))
+                if candidates:
+                    # Même texture : on déplacera (ou tournera) l'objet existant (état et image déjà chargés)
+                    moved.append((candidates.pop(), key))
+                else:
+                    created.append(key)
+
+        removed = [obj for instances in spare.values() for obj in instances]
+        return created, removed, moved
+
+    def _apply(self, created_keys, removed, moved):
+        """Applique le résultat de la comparaison (thread de simulation) : objets déplacés et créés"""
+        destroyed = self.destroyed_during_diff
+        removed = [obj for obj in removed if id(obj) not in destroyed]
+        moved_objects = []
+        for obj, key in moved:
+            if id(obj) in destroyed:
+                # Détruit entre-temps : un nouvel objet prend sa place
+                created_keys.append(key)
+                continue
+            obj.x, obj.y, obj.z, obj.yaw = key[1], key[2], key[3], key[5]
+            obj.map_key = key
+            moved_objects.append(obj)
+
+        created = []
+        for key in created_keys:
+            try:
+                created.append(GameObject(key[0], x=key[1], y=key[2], z=key[3], destroyable=key[4], yaw=key[5]))
+            except (pygame.error, OSError) as error:
+                print(f"Hot reload: cannot load {key[0]} ({error})")
+        return created, removed, moved_objects
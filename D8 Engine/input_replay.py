@@ -0,0 +1,73 @@
+"""Module contenant l'enregistrement et la relecture déterministe des entrées du joueur"""
+import struct
+import pygame
+
+
+# Format binaire compact : en-tête, puis une entrée par frame suivie de ses événements
+MAGIC = b"D8IR"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")  # Signature, version, graine aléatoire
+FRAME = struct.Struct("<HhhH")  # Durée de frame (ms), souris X, souris Y, nombre d'événements
+EVENT = struct.Struct("<Bi")  # Type d'événement, touche ou bouton
+
+# Seuls les événements utilisés par Game.handle_events sont enregistrés
+EVENT_TYPES = [pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP]
+EVENT_CODES = {event_type: code for code, event_type in enumerate(EVENT_TYPES)}
+
+
+class InputRecorder:
+    """Écrit pour chaque frame sa durée, la position de la souris et les événements"""
+    def __init__(self, path, seed):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed))
+        self.frame_count = 0
+
+    def record(self, frame_ms, mouse_pos, events):
+        """Ajoute une frame à l'enregistrement"""
+        recorded = []
+        for event in events:
+            code = EVENT_CODES.get(event.type)
+            if code is None:
+                continue
+            value = event.key if code < 2 else event.button
+            recorded.append(EVENT.pack(code, value))
+
+        self.file.write(FRAME.pack(frame_ms, mouse_pos[0], mouse_pos[1], len(recorded)))
+        self.file.write(b"".join(recorded))
+        self.frame_count += 1
+
+    def close(self):
+        self.file.close()
+        print(f"Input recording saved ({self.frame_count} frames)")
+
+
+class InputReplay:
+    """Relit un enregistrement frame par frame pour rejouer exactement la même session"""
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = f.read()
+        magic, version, self.seed = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a D8 Engine input recording")
+        self.offset = HEADER.size
+        self.frame_index = 0
+
+    def next_frame(self):
+        """Retourne (frame_ms, mouse_pos, events) pour la frame suivante, ou None à la fin"""
+        if self.offset + FRAME.size > len(self.data):
+            return None
+        frame_ms, mouse_x, mouse_y, event_count = FRAME.unpack_from(self.data, self.offset)
+        self.offset += FRAME.size
+
+        events = []
+        for _ in range(event_count):
+            code, value = EVENT.unpack_from(self.data, self.offset)
+            self.offset += EVENT.size
+            event_type = EVENT_TYPES[code]
+            if code < 2:
+                events.append(pygame.event.Event(event_type, key=value))
+            else:
+                events.append(pygame.event.Event(event_type, button=value, pos=(mouse_x, mouse_y)))
+
+        self.frame_index += 1
+        return frame_ms, (mouse_x, mouse_y), events
@@ -0,0 +1,14 @@
+"""Fichier d'ambiance sonore de la map pour D8 Engine"""
+from environment_audio import SoundEmitter, AudioZone
+
+
+def load_ambience():
+    """Retourne les émetteurs positionnels et les zones d'ambiance de la map
+
+    Exemple :
+        emitters = [SoundEmitter("assets/river.wav", x=-450.0, z=-350.0, radius=900.0)]
+        zones = [AudioZone("assets/forest.wav", x1=-1500.0, z1=-2000.0, x2=1600.0, z2=1300.0)]
+    """
+    emitters = []
+    zones = []
+    return emitters, zones
@@ -1,12 +1,23 @@
 """Éditeur de map avec vue top-down pour créer facilement des niveaux"""
 import pygame
+import gc
+import math
+import os
 import sys
+import time
+from itertools import islice
+from editor_history import EditHistory, AddObjects, RemoveObjects, MoveObjects, SetProperty
+from spatial_grid import SpatialGrid
+from brush import poisson_disk_fill
+from prototypes import COLLISION_RADIUS
+from map_io import MapExporter, iter_map_objects, LAYERS, DEFAULT_LAYER
+from thumbnails import ThumbnailAtlas
 
 pygame.init()
 
 class MapEditor:
     """Éditeur de map top-down"""
-    def __init__(self):
+    def __init__(self, map_file="map/map.py"):
         self.screen = pygame.display.set_mode((1200, 800))
         pygame.display.set_caption("D8 Engine - Map Editor")
         self.clock = pygame.time.Clock()
@@ -20,8 +31,9 @@ class MapEditor:
         # Échelle de la vue (pixels par unité 3D)
         self.scale = 0.5  # 1 unité 3D = 0.5 pixel
         
-        # Liste des objets placés
+        # Liste des objets placés et index spatial associé (tenu à jour par les modifications)
         self.objects = []
+        self.spatial_index = SpatialGrid(cell_size=200)
         
         # Objet sélectionné pour modification
         self.selected_object = None
@@ -31,17 +43,49 @@ class MapEditor:
         
         # Drag and drop
         self.dragging = False
-        self.drag_offset_x = 0
-        self.drag_offset_z = 0
+        self.dragged_objects = []
+        self.drag_offsets = []  # Décalage (x, z) de chaque objet glissé par rapport à la souris
+        self.drag_start_positions = []  # Positions avant le glisser (pour l'annulation)
+        
+        # Sélection rectangulaire (glisser sur une zone vide)
+        self.box_selecting = False
+        self.box_start = (0, 0)
+        self.box_end = (0, 0)
         
         # Grid snapping
         self.snap_to_grid = False
         self.grid_size = 50  # Grid cell size
         
-        # Undo/Redo
-        self.history = []  # List of states for undo
-        self.history_index = -1
-        self.max_history = 50
+        # Pinceau : disperse des objets espacés d'au moins le rayon de collision du moteur
+        self.brush_mode = False
+        self.brush_texture = 'assets/tree.png'
+        self.brush_radius = 300
+        self.brush_spacing = COLLISION_RADIUS
+        self.brush_max_points = 64  # Objets posés au plus par frame, pour ne jamais bloquer l'affichage
+        self.painting = False
+        self.stroke_objects = []  # Objets posés pendant le coup de pinceau en cours
+        self.last_dab = (0, 0)
+        self.last_dab_full = False  # Le dernier point de pinceau a atteint sa limite d'objets
+        
+        # Export et sauvegarde automatique sur un thread de travail
+        self.exporter = MapExporter()
+        self.export_changes = {}  # id(objet) -> valeurs modifiées depuis le dernier export (à reformater)
+        self.pending_export = None  # Fichier à exporter dès que le thread d'export est libre
+        self.revision = 0  # Incrémenté à chaque modification de la map
+        self.autosave_revision = 0
+        self.autosave_interval = 60.0  # Secondes
+        self.autosave_filename = "map/autosave.py"
+        self.last_autosave_time = time.time()
+        
+        # Chargement progressif de la map existante (lecture sans exécution du fichier)
+        self.map_file = map_file
+        self.map_loader = iter_map_objects(map_file) if os.path.exists(map_file) else None
+        self.loaded_count = 0
+        self.load_batch_size = 128  # Objets lus entre deux vérifications du budget de temps
+        self.load_budget = 0.010  # Secondes de chargement par frame
+        
+        # Undo/Redo (commandes de modification, pas de copies de la map)
+        self.history = EditHistory(max_history=50)
         
         # Multi-select
         self.selected_objects = []  # Multiple selection support
@@ -57,6 +101,43 @@ class MapEditor:
         self.selected_color = (255, 200, 50)
         self.text_color = (255, 255, 255)
         
+        # Cache des étiquettes rendues (texte -> surface) et zoom minimal pour les afficher
+        self.label_cache = {}
+        self.max_cached_labels = 5000
+        self.label_min_scale = 0.3
+        
+        # Miniatures des textures (atlas partagé, cache disque)
+        self.thumbnails = ThumbnailAtlas()
+        
+        # Vue de densité quand on dézoome : les objets sont regroupés par cluster de l'index spatial
+        self.cluster_max_scale = 0.25
+        self.density_mode = 'clusters'  # 'clusters' (marqueurs avec nombre) ou 'heatmap'
+        self.heatmap_palette = [(int(40 + 215 * t), int(60 + 120 * t * (1 - t) * 4), int(160 * (1 - t)))
+                                for t in (i / 31 for i in range(32))]
+        self.density_label = ""
+        self.density_revision = -1
+        
+        # Statistiques maintenues à chaque modification (pas de parcours complet par frame)
+        self.stats = {'trees': 0, 'statues': 0, 'destroyable': 0}
+        
+        # Index des objets par texture, calque et destructibilité : changer de filtre est instantané
+        self.texture_index = {}  # texture -> {id(objet): objet}
+        self.layer_index = {}
+        self.destroyable_index = {}
+        self.membership_revision = 0  # Incrémenté quand le contenu des index change
+        self.active_layer = DEFAULT_LAYER  # Calque des nouveaux objets (L pour changer)
+        self.rotation_step = 15  # Degrés par appui sur Q/E ou cran de molette (Ctrl)
+        
+        # Liste d'objets virtualisée : seules les lignes visibles sont dessinées
+        self.list_rect = pygame.Rect(950, 200, 240, 590)
+        self.list_filters = {'texture': None, 'destroyable': None, 'layer': None}
+        self.filter_rects = {}
+        self.list_scroll = 0
+        self.list_row_height = 18
+        self.list_rows_top = 0
+        self.filtered_objects = None  # None : pas de filtre, la liste est self.objects
+        self.filtered_revision = -1
+        
         # Mode d'édition
         self.show_input_dialog = False
         self.input_fields = {
@@ -85,40 +166,210 @@ class MapEditor:
         
         return x, z
     
-    def save_state(self):
-        """Save current state for undo/redo"""
-        # Remove any states after current index
-        self.history = self.history[:self.history_index + 1]
-        
-        # Deep copy current state
-        import copy
-        state = copy.deepcopy(self.objects)
-        self.history.append(state)
+    def _count_object(self, obj, sign):
+        """Ajoute (sign=1) ou retire (sign=-1) un objet des statistiques et des index de filtres"""
+        key = id(obj)
+        for index, value in ((self.texture_index, obj['texture']), (self.layer_index, obj['layer']),
+                             (self.destroyable_index, obj['destroyable'])):
+            if sign > 0:
+                index.setdefault(value, {})[key] = obj
+            else:
+                bucket = index[value]
+                del bucket[key]
+                if not bucket:
+                    del index[value]
+        self.membership_revision += 1
         
-        # Limit history size
-        if len(self.history) > self.max_history:
-            self.history.pop(0)
+        texture = obj['texture'].lower()
+        if 'tree' in texture:
+            self.stats['trees'] += sign
+        if 'statue' in texture:
+            self.stats['statues'] += sign
+        if obj['destroyable']:
+            self.stats['destroyable'] += sign
+    
+    def _touch(self, obj):
+        """Relève les valeurs d'un objet après modification (sa ligne d'export sera reformatée)"""
+        self.export_changes[id(obj)] = (obj['texture'], obj['x'], obj['y'], obj['z'], obj['destroyable'],
+                                        obj['layer'], obj['yaw'])
+    
+    def _insert_objects(self, entries):
+        """Insère des objets à des positions données (entrées (indice, objet) triées par indice)"""
+        if not entries:
+            return
+        self.revision += 1
+        for _, obj in entries:
+            obj.setdefault('layer', DEFAULT_LAYER)
+            obj.setdefault('yaw', 0.0)
+            self._touch(obj)
+            self._count_object(obj, 1)
+            self.spatial_index.insert(obj)
+        if entries[0][0] >= len(self.objects):
+            # Cas fréquent : ajout en fin de liste
+            self.objects.extend(obj for _, obj in entries)
+        elif len(entries) == 1:
+            self.objects.insert(*entries[0])
+        else:
+            # Fusion en une seule passe au lieu d'un insert par objet
+            merged = []
+            remaining = iter(self.objects)
+            for index, obj in entries:
+                while len(merged) < index:
+                    merged.append(next(remaining))
+                merged.append(obj)
+            merged.extend(remaining)
+            self.objects[:] = merged
+    
+    def _delete_objects(self, objects):
+        """Retire des objets et retourne leurs (indice, objet) pour pouvoir les réinsérer"""
+        ids = {id(obj) for obj in objects}
+        count = len(ids)
+        if not count:
+            return []
+        tail_start = len(self.objects) - count
+        if tail_start >= 0 and all(id(obj) in ids for obj in self.objects[tail_start:]):
+            # Cas fréquent : annulation des derniers objets ajoutés
+            entries = list(enumerate(self.objects[tail_start:], start=tail_start))
+            del self.objects[tail_start:]
         else:
-            self.history_index += 1
+            entries = [(index, obj) for index, obj in enumerate(self.objects) if id(obj) in ids]
+            self.objects[:] = [obj for obj in self.objects if id(obj) not in ids]
+        self.revision += 1
+        for _, obj in entries:
+            self._touch(obj)
+            self._count_object(obj, -1)
+            self.spatial_index.remove(obj)
+        return entries
+    
+    def _set_positions(self, objects, positions):
+        """Place des objets aux positions (x, z) données"""
+        self.revision += 1
+        for obj, (x, z) in zip(objects, positions):
+            obj['x'] = x
+            obj['z'] = z
+            self.spatial_index.move(obj)
+            self._touch(obj)
+    
+    def _set_property(self, objects, key, values):
+        """Affecte une valeur de propriété à chaque objet"""
+        self.revision += 1
+        for obj, value in zip(objects, values):
+            self._count_object(obj, -1)
+            obj[key] = value
+            self._count_object(obj, 1)
+            self._touch(obj)
+    
+    def add_objects(self, objects):
+        """Ajoute des objets à la map (annulable en une seule fois)"""
+        self._insert_objects([(len(self.objects) + i, obj) for i, obj in enumerate(objects)])
+        self.history.push(AddObjects(objects))
+    
+    def remove_objects(self, objects):
+        """Supprime des objets de la map (annulable en une seule fois)"""
+        entries = self._delete_objects(objects)
+        if entries:
+            self.history.push(RemoveObjects(entries))
+    
+    def commit_move(self, objects, old_positions):
+        """Enregistre un déplacement déjà effectué (ex: fin d'un glisser)"""
+        new_positions = [(obj['x'], obj['z']) for obj in objects]
+        if new_positions != old_positions:
+            self.history.push(MoveObjects(objects, old_positions, new_positions))
+    
+    def set_property(self, objects, key, value):
+        """Modifie une propriété sur plusieurs objets (annulable en une seule fois)"""
+        old_values = [obj[key] for obj in objects]
+        new_values = [value] * len(objects)
+        self._set_property(objects, key, new_values)
+        self.history.push(SetProperty(objects, key, old_values, new_values))
+    
+    def rotate_objects(self, objects, degrees):
+        """Tourne chaque objet sur lui-même (orientation en degrés, annulable en une seule fois)"""
+        old_values = [obj['yaw'] for obj in objects]
+        new_values = [round((yaw + degrees) % 360, 2) for yaw in old_values]
+        self._set_property(objects, 'yaw', new_values)
+        self.history.push(SetProperty(objects, 'yaw', old_values, new_values))
     
     def undo(self):
         """Undo last action"""
-        if self.history_index > 0:
-            self.history_index -= 1
-            import copy
-            self.objects = copy.deepcopy(self.history[self.history_index])
+        if self.history.undo(self):
             self.selected_object = None
             self.selected_objects = []
     
     def redo(self):
         """Redo last undone action"""
-        if self.history_index < len(self.history) - 1:
-            self.history_index += 1
-            import copy
-            self.objects = copy.deepcopy(self.history[self.history_index])
+        if self.history.redo(self):
             self.selected_object = None
             self.selected_objects = []
     
+    def pick_object(self, screen_x, screen_y, tolerance=20):
+        """Retourne l'objet sous le curseur (tolérance en pixels), ou None"""
+        world_x = (screen_x - 600) / self.scale + self.camera_x
+        world_z = (screen_y - 400) / self.scale + self.camera_z
+        return self.spatial_index.query_nearest(world_x, world_z, tolerance / self.scale)
+    
+    def select_in_box(self, add_to_selection=False):
+        """Sélectionne tous les objets du rectangle de sélection"""
+        (x1, y1), (x2, y2) = self.box_start, self.box_end
+        min_x = (min(x1, x2) - 600) / self.scale + self.camera_x
+        max_x = (max(x1, x2) - 600) / self.scale + self.camera_x
+        min_z = (min(y1, y2) - 400) / self.scale + self.camera_z
+        max_z = (max(y1, y2) - 400) / self.scale + self.camera_z
+        found = self.spatial_index.query_rect(min_x, min_z, max_x, max_z)
+        
+        if add_to_selection:
+            selected_ids = {id(obj) for obj in self.selected_objects}
+            self.selected_objects.extend(obj for obj in found if id(obj) not in selected_ids)
+        else:
+            self.selected_objects = found
+        self.selected_object = self.selected_objects[-1] if self.selected_objects else None
+        print(f"{len(found)} objects selected")
+    
+    def start_drag(self, mouse_x, mouse_y):
+        """Commence à glisser tous les objets sélectionnés"""
+        self.dragging = True
+        self.dragged_objects = list(self.selected_objects)
+        self.drag_start_positions = [(obj['x'], obj['z']) for obj in self.dragged_objects]
+        world_x, world_z = self.screen_to_world(mouse_x, mouse_y)
+        self.drag_offsets = [(obj['x'] - world_x, obj['z'] - world_z) for obj in self.dragged_objects]
+    
+    def open_create_dialog(self, screen_x, screen_y):
+        """Ouvre la boîte de dialogue de création d'objet à une position écran"""
+        world_x, world_z = self.screen_to_world(screen_x, screen_y)
+        self.temp_position = (world_x, world_z)
+        self.show_input_dialog = True
+        self.input_fields = {
+            'texture': '',
+            'y': '0',
+            'destroyable': 'False'
+        }
+        self.active_field = 'texture'
+    
+    def paint_at(self, screen_x, screen_y):
+        """Disperse des objets dans le disque du pinceau autour d'une position écran"""
+        self.last_dab = (screen_x, screen_y)
+        center_x = (screen_x - 600) / self.scale + self.camera_x
+        center_z = (screen_y - 400) / self.scale + self.camera_z
+        reach = self.brush_radius + self.brush_spacing
+        existing = [(obj['x'], obj['z']) for obj in
+                    self.spatial_index.query_rect(center_x - reach, center_z - reach, center_x + reach, center_z + reach)]
+        points = poisson_disk_fill(center_x, center_z, self.brush_radius, self.brush_spacing, existing,
+                                   max_points=self.brush_max_points)
+        self.last_dab_full = len(points) >= self.brush_max_points
+        
+        new_objects = [{
+            'texture': self.brush_texture,
+            'x': round(x, 2),
+            'y': 0.0,
+            'z': round(z, 2),
+            'destroyable': False,
+            'layer': self.active_layer,
+            'yaw': 0.0
+        } for x, z in points]
+        # Pas d'entrée d'historique ici : tout le coup de pinceau est enregistré au relâchement
+        self._insert_objects([(len(self.objects) + i, obj) for i, obj in enumerate(new_objects)])
+        self.stroke_objects.extend(new_objects)
+    
     def handle_events(self):
         """Gère les événements"""
         for event in pygame.event.get():
@@ -126,17 +377,20 @@ class MapEditor:
                 self.running = False
                 
             elif event.type == pygame.MOUSEBUTTONDOWN:
+                if self.list_rect.collidepoint(event.pos) and not self.show_input_dialog:
+                    # Clic dans la liste d'objets : aucune édition sur la carte
+                    if event.button == 1:
+                        self.click_object_list(*event.pos)
+                    continue
                 if event.button == 1:  # Clic gauche
-                    if not self.show_input_dialog:
+                    if self.brush_mode and not self.show_input_dialog:
+                        self.painting = True
+                        self.stroke_objects = []
+                        self.paint_at(*event.pos)
+                    elif not self.show_input_dialog:
                         # Vérifier si on clique sur un objet existant
                         mouse_x, mouse_y = event.pos
-                        clicked_object = None
-                        
-                        for obj in self.objects:
-                            sx, sy = self.world_to_screen(obj['x'], obj['z'])
-                            if abs(sx - mouse_x) < 20 and abs(sy - mouse_y) < 20:
-                                clicked_object = obj
-                                break
+                        clicked_object = self.pick_object(mouse_x, mouse_y)
                         
                         if clicked_object:
                             # Multi-select with Shift
@@ -147,45 +401,72 @@ class MapEditor:
                                     self.selected_objects.append(clicked_object)
                                 self.selected_object = clicked_object
                             else:
-                                # Single select and start drag
+                                # Un clic sur un objet déjà sélectionné glisse toute la sélection
+                                if not any(obj is clicked_object for obj in self.selected_objects):
+                                    self.selected_objects = [clicked_object]
                                 self.selected_object = clicked_object
-                                self.selected_objects = [clicked_object]
-                                self.dragging = True
-                                world_x, world_z = self.screen_to_world(mouse_x, mouse_y)
-                                self.drag_offset_x = clicked_object['x'] - world_x
-                                self.drag_offset_z = clicked_object['z'] - world_z
+                                self.start_drag(mouse_x, mouse_y)
                         else:
-                            # Ouvrir la boîte de dialogue pour créer un nouvel objet
-                            world_x, world_z = self.screen_to_world(mouse_x, mouse_y)
-                            self.temp_position = (world_x, world_z)
-                            self.show_input_dialog = True
-                            self.input_fields = {
-                                'texture': '',
-                                'y': '0',
-                                'destroyable': 'False'
-                            }
-                            self.active_field = 'texture'
+                            # Zone vide : sélection rectangulaire (un simple clic crée un objet)
+                            self.box_selecting = True
+                            self.box_start = event.pos
+                            self.box_end = event.pos
                             
                 elif event.button == 3:  # Clic droit - supprimer
                     if self.selected_object:
-                        self.objects.remove(self.selected_object)
+                        self.remove_objects([self.selected_object])
+                        if self.selected_object in self.selected_objects:
+                            self.selected_objects.remove(self.selected_object)
                         self.selected_object = None
             
             elif event.type == pygame.MOUSEBUTTONUP:
                 if event.button == 1:  # Relâchement clic gauche
+                    if self.painting:
+                        # Un coup de pinceau complet = une seule opération annulable
+                        self.painting = False
+                        if self.stroke_objects:
+                            self.history.push(AddObjects(self.stroke_objects))
+                            print(f"Brush: {len(self.stroke_objects)} objects placed")
+                        self.stroke_objects = []
+                    
+                    if self.dragging:
+                        # Tout le glisser devient une seule commande d'annulation
+                        self.commit_move(self.dragged_objects, self.drag_start_positions)
+                        self.dragged_objects = []
                     self.dragging = False
+                    
+                    if self.box_selecting:
+                        self.box_selecting = False
+                        self.box_end = event.pos
+                        if abs(self.box_end[0] - self.box_start[0]) < 5 and abs(self.box_end[1] - self.box_start[1]) < 5:
+                            # Ouvrir la boîte de dialogue pour créer un nouvel objet
+                            self.open_create_dialog(*self.box_start)
+                        else:
+                            self.select_in_box(pygame.key.get_mods() & pygame.KMOD_SHIFT)
             
             elif event.type == pygame.MOUSEMOTION:
-                if self.dragging and self.selected_object:
-                    # Déplacer l'objet avec la souris
+                if self.dragging:
+                    # Déplacer les objets avec la souris
                     mouse_x, mouse_y = event.pos
                     world_x, world_z = self.screen_to_world(mouse_x, mouse_y)
-                    self.selected_object['x'] = round(world_x + self.drag_offset_x, 2)
-                    self.selected_object['z'] = round(world_z + self.drag_offset_z, 2)
+                    for obj, (offset_x, offset_z) in zip(self.dragged_objects, self.drag_offsets):
+                        obj['x'] = round(world_x + offset_x, 2)
+                        obj['z'] = round(world_z + offset_z, 2)
+                        self.spatial_index.move(obj)
+                        self._touch(obj)
+                    self.revision += 1
+                elif self.box_selecting:
+                    self.box_end = event.pos
             
             elif event.type == pygame.MOUSEWHEEL:
+                if self.list_rect.collidepoint(pygame.mouse.get_pos()):
+                    # Défilement de la liste d'objets
+                    self.list_scroll = max(0, self.list_scroll - event.y * 3)
+                elif pygame.key.get_mods() & pygame.KMOD_CTRL and self.selected_objects:
+                    # Ctrl+molette : rotation de la sélection
+                    self.rotate_objects(self.selected_objects, -self.rotation_step * event.y)
                 # Zoom avec la molette de la souris
-                if event.y > 0:  # Scroll up - zoom in
+                elif event.y > 0:  # Scroll up - zoom in
                     self.scale = min(2.0, self.scale + 0.05)
                 elif event.y < 0:  # Scroll down - zoom out
                     self.scale = max(0.1, self.scale - 0.05)
@@ -219,12 +500,39 @@ class MapEditor:
                         self.snap_to_grid = not self.snap_to_grid
                         print(f"Grid snap: {'ON' if self.snap_to_grid else 'OFF'}")
                     elif event.key == pygame.K_DELETE and self.selected_object:
-                        self.save_state()
-                        for obj in self.selected_objects:
-                            if obj in self.objects:
-                                self.objects.remove(obj)
+                        self.remove_objects(self.selected_objects)
                         self.selected_object = None
                         self.selected_objects = []
+                    elif event.key == pygame.K_b:
+                        # Toggle brush mode (B key), paints with the selected object's texture
+                        self.brush_mode = not self.brush_mode
+                        if self.selected_object:
+                            self.brush_texture = self.selected_object['texture']
+                        print(f"Brush: {'ON' if self.brush_mode else 'OFF'} ({self.brush_texture})")
+                    elif event.key == pygame.K_l:
+                        if pygame.key.get_mods() & pygame.KMOD_SHIFT:
+                            # Move the selection to the active layer (Shift+L)
+                            if self.selected_objects:
+                                self.set_property(self.selected_objects, 'layer', self.active_layer)
+                        else:
+                            # Cycle the layer given to new objects (L key)
+                            self.active_layer = LAYERS[(LAYERS.index(self.active_layer) + 1) % len(LAYERS)]
+                        print(f"Active layer: {self.active_layer}")
+                    elif event.key == pygame.K_h:
+                        # Toggle density view style when zoomed out (H key)
+                        self.density_mode = 'heatmap' if self.density_mode == 'clusters' else 'clusters'
+                        print(f"Density view: {self.density_mode}")
+                    elif event.key == pygame.K_LEFTBRACKET:
+                        self.brush_radius = max(100, self.brush_radius - 50)
+                    elif event.key == pygame.K_RIGHTBRACKET:
+                        self.brush_radius = min(2000, self.brush_radius + 50)
+                    elif event.key == pygame.K_t and self.selected_object:
+                        # Toggle destroyable on the selection (T key)
+                        self.set_property(self.selected_objects, 'destroyable', not self.selected_object['destroyable'])
+                    elif event.key in (pygame.K_q, pygame.K_e) and self.selected_objects:
+                        # Rotate the selection (Q/E, Shift for 45°)
+                        step = 45 if pygame.key.get_mods() & pygame.KMOD_SHIFT else self.rotation_step
+                        self.rotate_objects(self.selected_objects, -step if event.key == pygame.K_q else step)
                     elif event.key == pygame.K_z and pygame.key.get_mods() & pygame.KMOD_CTRL:
                         # Undo (Ctrl+Z)
                         self.undo()
@@ -235,18 +543,20 @@ class MapEditor:
                         print("Redo")
                     elif event.key == pygame.K_d and pygame.key.get_mods() & pygame.KMOD_CTRL:
                         # Quick duplicate (Ctrl+D)
-                        if self.selected_object:
-                            self.save_state()
-                            new_obj = self.selected_object.copy()
-                            new_obj['x'] += 50
-                            new_obj['z'] += 50
-                            self.objects.append(new_obj)
-                            self.selected_object = new_obj
-                            self.selected_objects = [new_obj]
-                            print("Object duplicated!")
+                        if self.selected_objects:
+                            new_objects = []
+                            for obj in self.selected_objects:
+                                new_obj = obj.copy()
+                                new_obj['x'] += 50
+                                new_obj['z'] += 50
+                                new_objects.append(new_obj)
+                            self.add_objects(new_objects)
+                            self.selected_object = new_objects[-1]
+                            self.selected_objects = new_objects
+                            print(f"{len(new_objects)} object(s) duplicated!")
                     elif event.key == pygame.K_s and pygame.key.get_mods() & pygame.KMOD_CTRL:
                         # Save (Ctrl+S)
-                        self.export_map()
+                        self.export_map(self.map_file)
                     elif event.key == pygame.K_c and pygame.key.get_mods() & pygame.KMOD_CTRL:
                         # Copy (Ctrl+C)
                         if self.selected_object:
@@ -255,13 +565,12 @@ class MapEditor:
                     elif event.key == pygame.K_v and pygame.key.get_mods() & pygame.KMOD_CTRL:
                         # Paste (Ctrl+V)
                         if self.copied_object:
-                            self.save_state()
                             mouse_x, mouse_y = pygame.mouse.get_pos()
                             world_x, world_z = self.screen_to_world(mouse_x, mouse_y)
                             new_object = self.copied_object.copy()
                             new_object['x'] = round(world_x, 2)
                             new_object['z'] = round(world_z, 2)
-                            self.objects.append(new_object)
+                            self.add_objects([new_object])
                             self.selected_object = new_object
                             self.selected_objects = [new_object]
                             print("Object pasted!")
@@ -280,23 +589,61 @@ class MapEditor:
         
         destroyable = self.input_fields['destroyable'].strip().lower() in ['true', '1', 'yes', 'oui']
         
-        self.save_state()  # Save state before adding new object
-        
         new_object = {
             'texture': texture,
             'x': round(self.temp_position[0], 2),
             'y': y,
             'z': round(self.temp_position[1], 2),
-            'destroyable': destroyable
+            'destroyable': destroyable,
+            'layer': self.active_layer,
+            'yaw': 0.0
         }
         
-        self.objects.append(new_object)
+        self.add_objects([new_object])
         self.selected_object = new_object
         self.selected_objects = [new_object]
         self.show_input_dialog = False
     
+    def load_map_step(self):
+        """Charge une partie de la map, dans la limite du budget de temps de la frame"""
+        deadline = time.perf_counter() + self.load_budget
+        while time.perf_counter() < deadline:
+            batch = list(islice(self.map_loader, self.load_batch_size))
+            self._insert_objects([(len(self.objects) + i, obj) for i, obj in enumerate(batch)])
+            self.loaded_count += len(batch)
+            if len(batch) < self.load_batch_size:
+                # Fin du fichier : le chargement ne compte pas comme une modification à sauvegarder
+                self.map_loader = None
+                self.autosave_revision = self.revision
+                print(f"Map loaded from {self.map_file} with {self.loaded_count} objects")
+                break
+        # Les objets chargés (sans cycles, libérés par comptage de références) sortent du ramasse-miettes
+        # cyclique : ses passes complètes ne reparcourent pas toute la map à chaque génération
+        gc.freeze()
+    
     def update(self):
         """Met à jour la logique de l'éditeur"""
+        if self.map_loader:
+            self.load_map_step()
+        
+        # Export différé (le thread était occupé) et sauvegarde automatique périodique
+        if self.pending_export and not self.exporter.busy():
+            self.export_map(self.pending_export)
+        now = time.time()
+        if now - self.last_autosave_time >= self.autosave_interval:
+            self.last_autosave_time = now
+            if self.revision != self.autosave_revision and not self.exporter.busy() and not self.map_loader:
+                self.autosave_revision = self.revision
+                self.export_map(self.autosave_filename)
+        
+        if self.painting:
+            # Au plus un point de pinceau par frame : tous les tiers de rayon parcourus,
+            # ou tant que le disque n'est pas rempli
+            mouse_x, mouse_y = pygame.mouse.get_pos()
+            step = max(4, self.brush_radius * self.scale / 3)
+            if self.last_dab_full or abs(mouse_x - self.last_dab[0]) > step or abs(mouse_y - self.last_dab[1]) > step:
+                self.paint_at(mouse_x, mouse_y)
+        
         if not self.show_input_dialog:
             keys = pygame.key.get_pressed()
             
@@ -338,31 +685,127 @@ class MapEditor:
             if -100 < sy1 < 900:
                 pygame.draw.line(self.screen, self.grid_color, (sx1, sy1), (sx2, sy2), 1)
     
+    def get_label(self, text, color):
+        """Retourne la surface d'une étiquette, rendue une seule fois"""
+        key = (text, color)
+        surface = self.label_cache.get(key)
+        if surface is None:
+            if len(self.label_cache) >= self.max_cached_labels:
+                self.label_cache.clear()
+            surface = self.font.render(text, True, color)
+            self.label_cache[key] = surface
+        return surface
+    
+    def get_visible_rect(self, margin=40):
+        """Retourne le rectangle du monde visible à l'écran (min_x, min_z, max_x, max_z)"""
+        half_width = (600 + margin) / self.scale
+        half_height = (400 + margin) / self.scale
+        return (self.camera_x - half_width, self.camera_z - half_height,
+                self.camera_x + half_width, self.camera_z + half_height)
+    
+    def get_visible_objects(self):
+        """Retourne les objets situés dans la zone visible"""
+        return self.spatial_index.query_rect(*self.get_visible_rect())
+    
     def draw_objects(self):
-        """Dessine tous les objets placés"""
-        for obj in self.objects:
+        """Dessine les objets placés visibles à l'écran"""
+        if self.scale < self.cluster_max_scale:
+            self.draw_density()
+            return
+        
+        selected_ids = {id(obj) for obj in self.selected_objects}
+        if self.selected_object is not None:
+            selected_ids.add(id(self.selected_object))
+        show_labels = self.scale >= self.label_min_scale
+        rect_size = 40
+        
+        # Taille des miniatures selon le zoom
+        if self.scale < 0.3:
+            preview_size = 16
+        elif self.scale < 1.0:
+            preview_size = 32
+        else:
+            preview_size = 64
+        
+        for obj in self.get_visible_objects():
             sx, sy = self.world_to_screen(obj['x'], obj['z'])
+            is_selected = id(obj) in selected_ids
+            
+            thumbnail = self.thumbnails.get(obj['texture'], preview_size)
+            if thumbnail:
+                # Aperçu de la texture, encadré de la couleur de sélection si besoin
+                atlas, area = thumbnail
+                rect = pygame.Rect(0, 0, preview_size + 6, preview_size + 6)
+                rect.center = (sx, sy)
+                pygame.draw.rect(self.screen, (60, 60, 60), rect, 0)
+                self.screen.blit(atlas, (sx - area.width // 2, sy - area.height // 2), area)
+                pygame.draw.rect(self.screen, self.selected_color if is_selected else (255, 255, 255), rect, 2)
+            else:
+                # Texture introuvable : carré de couleur
+                color = self.selected_color if is_selected else self.object_color
+                rect = pygame.Rect(sx - rect_size // 2, sy - rect_size // 2, rect_size, rect_size)
+                pygame.draw.rect(self.screen, color, rect, 0)
+                pygame.draw.rect(self.screen, (255, 255, 255), rect, 2)
+            
+            # Orientation : trait vers la face avant (yaw 0 = vers +Z, le bas de l'écran)
+            if obj['yaw'] or is_selected:
+                yaw = math.radians(obj['yaw'])
+                length = rect.width // 2 + 8
+                tip = (sx - math.sin(yaw) * length, sy + math.cos(yaw) * length)
+                pygame.draw.line(self.screen, self.selected_color if is_selected else (255, 160, 60), (sx, sy), tip, 2)
             
-            # Dessine un carré pour l'objet
-            is_selected = obj == self.selected_object or obj in self.selected_objects
-            color = self.selected_color if is_selected else self.object_color
-            rect_size = 40
-            rect = pygame.Rect(sx - rect_size // 2, sy - rect_size // 2, rect_size, rect_size)
-            pygame.draw.rect(self.screen, color, rect, 0)
-            pygame.draw.rect(self.screen, (255, 255, 255), rect, 2)
+            # Étiquettes masquées quand le zoom est trop faible pour être lisibles
+            if not show_labels:
+                continue
             
             # Affiche le nom de la texture (court)
             texture_name = obj['texture'].split('/')[-1].replace('.png', '')
-            text = self.font.render(texture_name, True, self.text_color)
+            text = self.get_label(texture_name, self.text_color)
             text_rect = text.get_rect(center=(sx, sy - rect_size // 2 - 10))
             self.screen.blit(text, text_rect)
             
             # Affiche les coordonnées en petit
             coords_text = f"({obj['x']:.0f}, {obj['z']:.0f})"
-            coords_surface = self.font.render(coords_text, True, (200, 200, 200))
+            coords_surface = self.get_label(coords_text, (200, 200, 200))
             coords_rect = coords_surface.get_rect(center=(sx, sy + rect_size // 2 + 10))
             self.screen.blit(coords_surface, coords_rect)
     
+    def draw_density(self):
+        """Dessine la vue agrégée (clusters ou heatmap) : coût borné par le nombre de cellules à l'écran"""
+        clusters = self.spatial_index.query_clusters(*self.get_visible_rect(margin=0))
+        if clusters:
+            cell_pixels = max(1, int(self.spatial_index.cluster_size * self.scale))
+            peak = max(count for _, count in clusters)
+            for (x, z), count in clusters:
+                sx, sy = self.world_to_screen(x, z)
+                if self.density_mode == 'heatmap':
+                    color = self.heatmap_palette[count * 31 // peak]
+                    self.screen.fill(color, (sx, sy, cell_pixels, cell_pixels))
+                else:
+                    center = (sx + cell_pixels // 2, sy + cell_pixels // 2)
+                    radius = min(cell_pixels // 2 - 2, 6 + int(3 * math.log2(count)))
+                    pygame.draw.circle(self.screen, self.object_color, center, radius)
+                    pygame.draw.circle(self.screen, (255, 255, 255), center, radius, 1)
+                    label = self.get_label(str(count), self.text_color)
+                    self.screen.blit(label, label.get_rect(center=center))
+        
+        # La sélection reste visible par-dessus les clusters
+        for obj in self.selected_objects:
+            pygame.draw.circle(self.screen, self.selected_color, self.world_to_screen(obj['x'], obj['z']), 3)
+    
+    def get_density_label(self):
+        """Statistique de densité (objets par cluster occupé), recalculée seulement après une modification"""
+        if self.density_revision != self.revision:
+            self.density_revision = self.revision
+            counts = self.spatial_index.cluster_counts
+            if counts:
+                size = self.spatial_index.cluster_size
+                average = len(self.spatial_index) / len(counts)
+                self.density_label = f"Density: {average:.1f} / {size}x{size} (max {max(counts.values())})"
+            else:
+                self.density_label = "Density: 0"
+        return self.density_label
+    
     def draw_ui(self):
         """Dessine l'interface utilisateur"""
         # Panneau d'informations en haut
@@ -371,12 +814,16 @@ class MapEditor:
             f"Camera: ({self.camera_x:.0f}, {self.camera_z:.0f}) | Scale: {self.scale:.2f}x",
             f"Objects: {len(self.objects)} | Selected: {len(self.selected_objects)}",
             f"Grid Snap: {'ON' if self.snap_to_grid else 'OFF'} (G to toggle)",
+            f"Brush: {'ON' if self.brush_mode else 'OFF'} ({self.brush_texture}, radius {self.brush_radius}) (B to toggle, [ ] to resize)",
+            f"Zoomed-out view: {self.density_mode} (H to toggle) | Layer: {self.active_layer} (L to cycle, Shift+L to assign)",
             "",
             "Controls:",
             "Arrows: Move camera | +/- : Zoom | G: Toggle grid snap",
             "Left Click: Place/Drag | Shift+Click: Multi-select | Right Click: Delete",
+            "Left Drag (empty area): Box select (Shift to add) | Drag selection: Move all",
             "Ctrl+C: Copy | Ctrl+V: Paste | Ctrl+D: Duplicate | Ctrl+S: Export",
-            "Ctrl+Z: Undo | Ctrl+Y: Redo | Delete: Remove selected"
+            "Ctrl+Z: Undo | Ctrl+Y: Redo | Delete: Remove selected | T: Toggle destroyable",
+            f"Q/E or Ctrl+Wheel: Rotate selected ({self.rotation_step}°, Shift+Q/E: 45°)"
         ]
         
         y_offset = 10
@@ -388,6 +835,16 @@ class MapEditor:
             self.screen.blit(surface, (10, y_offset))
             y_offset += 20 if text else 10
         
+        # Progression du chargement et de l'export en arrière-plan
+        if self.map_loader:
+            status = f"Loading {self.map_file}... {self.loaded_count} objects"
+            self.screen.blit(self.font.render(status, True, (100, 255, 100)), (10, 775))
+        elif self.exporter.busy():
+            status = f"Saving {self.exporter.filename}... {self.exporter.progress * 100:.0f}%"
+            self.screen.blit(self.font.render(status, True, (100, 255, 100)), (10, 775))
+        elif time.time() - self.exporter.last_message_time < 3.0:
+            self.screen.blit(self.font.render(self.exporter.last_message, True, (100, 255, 100)), (10, 775))
+        
         # Affiche les infos de l'objet sélectionné
         if self.selected_object:
             y_offset = 500
@@ -395,7 +852,9 @@ class MapEditor:
                 "=== Selected Object ===",
                 f"Texture: {self.selected_object['texture']}",
                 f"Position: ({self.selected_object['x']:.1f}, {self.selected_object['y']:.1f}, {self.selected_object['z']:.1f})",
-                f"Destroyable: {self.selected_object['destroyable']}"
+                f"Destroyable: {self.selected_object['destroyable']}",
+                f"Layer: {self.selected_object['layer']}",
+                f"Yaw: {self.selected_object['yaw']:.0f}°"
             ]
             for text in selected_texts:
                 surface = self.font.render(text, True, (255, 255, 100))
@@ -405,59 +864,130 @@ class MapEditor:
         # Object list panel (right side)
         self.draw_object_list()
     
+    def get_filtered_objects(self):
+        """Retourne les objets passant les filtres de la liste, recalculés seulement si les index ont changé"""
+        if self.filtered_revision != self.membership_revision:
+            self.filtered_revision = self.membership_revision
+            buckets = [index.get(self.list_filters[name], {}) for name, index in
+                       (('texture', self.texture_index), ('destroyable', self.destroyable_index),
+                        ('layer', self.layer_index)) if self.list_filters[name] is not None]
+            if not buckets:
+                self.filtered_objects = None
+            elif len(buckets) == 1:
+                self.filtered_objects = list(buckets[0].values())
+            else:
+                # Parcourt le plus petit ensemble et teste l'appartenance aux autres
+                buckets.sort(key=len)
+                smallest = buckets[0]
+                common = smallest.keys() & buckets[1].keys()
+                for other in buckets[2:]:
+                    common &= other.keys()
+                self.filtered_objects = [obj for key, obj in smallest.items() if key in common]
+        return self.objects if self.filtered_objects is None else self.filtered_objects
+    
+    def cycle_filter(self, name):
+        """Passe à la valeur suivante d'un filtre (None = tout afficher)"""
+        if name == 'texture':
+            choices = [None] + sorted(self.texture_index)
+        elif name == 'layer':
+            choices = [None] + list(LAYERS) + sorted(set(self.layer_index) - set(LAYERS))
+        else:
+            choices = [None, True, False]
+        current = self.list_filters[name]
+        index = choices.index(current) if current in choices else 0
+        self.list_filters[name] = choices[(index + 1) % len(choices)]
+        self.filtered_revision = -1
+        self.list_scroll = 0
+    
+    def click_object_list(self, mouse_x, mouse_y):
+        """Clic dans la liste : change un filtre, ou sélectionne un objet et centre la caméra dessus"""
+        for name, rect in self.filter_rects.items():
+            if rect.collidepoint(mouse_x, mouse_y):
+                self.cycle_filter(name)
+                return
+        if mouse_y < self.list_rows_top:
+            return
+        items = self.get_filtered_objects()
+        index = self.list_scroll + (mouse_y - self.list_rows_top) // self.list_row_height
+        if index >= len(items):
+            return
+        obj = items[index]
+        if pygame.key.get_mods() & pygame.KMOD_SHIFT:
+            if obj not in self.selected_objects:
+                self.selected_objects.append(obj)
+        else:
+            self.selected_objects = [obj]
+        self.selected_object = obj
+        self.camera_x = obj['x']
+        self.camera_z = obj['z']
+    
     def draw_object_list(self):
-        """Draw a list of all objects on the right side"""
-        panel_x = 950
-        panel_y = 200
-        panel_width = 240
-        panel_height = 590
+        """Draw the filterable, scrollable object list on the right side"""
+        panel_x, panel_y, panel_width, panel_height = self.list_rect
         
         # Background
-        pygame.draw.rect(self.screen, (30, 30, 30), (panel_x, panel_y, panel_width, panel_height))
-        pygame.draw.rect(self.screen, (255, 255, 255), (panel_x, panel_y, panel_width, panel_height), 2)
+        pygame.draw.rect(self.screen, (30, 30, 30), self.list_rect)
+        pygame.draw.rect(self.screen, (255, 255, 255), self.list_rect, 2)
         
         # Title
         title = self.font_large.render("Object List", True, (255, 255, 100))
         self.screen.blit(title, (panel_x + 10, panel_y + 10))
         
-        # Statistics
-        tree_count = sum(1 for obj in self.objects if 'tree' in obj['texture'].lower())
-        statue_count = sum(1 for obj in self.objects if 'statue' in obj['texture'].lower())
-        destroyable_count = sum(1 for obj in self.objects if obj['destroyable'])
-        
+        # Statistics (maintenues de façon incrémentale)
         stats = [
             f"Total: {len(self.objects)}",
-            f"Trees: {tree_count}",
-            f"Statues: {statue_count}",
-            f"Destroyable: {destroyable_count}"
+            f"Trees: {self.stats['trees']}",
+            f"Statues: {self.stats['statues']}",
+            f"Destroyable: {self.stats['destroyable']}",
+            self.get_density_label()
         ]
         
         y_offset = panel_y + 40
         for stat in stats:
-            stat_surface = self.font.render(stat, True, (200, 200, 200))
+            stat_surface = self.get_label(stat, (200, 200, 200))
             self.screen.blit(stat_surface, (panel_x + 10, y_offset))
             y_offset += 18
         
+        # Filters (click to cycle)
+        texture_filter = self.list_filters['texture']
+        destroyable_filter = self.list_filters['destroyable']
+        filter_texts = [
+            ('texture', f"Texture: {texture_filter.split('/')[-1] if texture_filter else 'all'}"),
+            ('destroyable', f"Destroyable: {'all' if destroyable_filter is None else destroyable_filter}"),
+            ('layer', f"Layer: {self.list_filters['layer'] or 'all'}"),
+        ]
+        y_offset += 5
+        for name, text in filter_texts:
+            active = self.list_filters[name] is not None
+            surface = self.get_label(f"[{text}]", (100, 200, 255) if active else (150, 150, 150))
+            self.filter_rects[name] = self.screen.blit(surface, (panel_x + 10, y_offset))
+            y_offset += 18
+        
         # Separator
         pygame.draw.line(self.screen, (100, 100, 100), (panel_x + 10, y_offset + 5), (panel_x + panel_width - 10, y_offset + 5), 1)
         y_offset += 15
         
-        # Object list (scrollable)
-        max_display = 20
-        start_index = max(0, len(self.objects) - max_display)
+        # Lignes visibles uniquement (les surfaces de texte viennent du cache d'étiquettes)
+        items = self.get_filtered_objects()
+        self.list_rows_top = y_offset
+        visible_rows = (panel_y + panel_height - 10 - y_offset) // self.list_row_height
+        self.list_scroll = max(0, min(self.list_scroll, len(items) - visible_rows))
+        selected_ids = {id(obj) for obj in self.selected_objects}
         
-        for i, obj in enumerate(self.objects[start_index:], start=start_index):
-            if y_offset > panel_y + panel_height - 25:
-                break
-            
+        for i in range(self.list_scroll, min(len(items), self.list_scroll + visible_rows)):
+            obj = items[i]
             texture_name = obj['texture'].split('/')[-1].replace('.png', '')
-            is_selected = obj in self.selected_objects
-            color = (255, 255, 100) if is_selected else (180, 180, 180)
-            
-            obj_text = f"{i+1}. {texture_name[:15]}"
-            obj_surface = self.font.render(obj_text, True, color)
-            self.screen.blit(obj_surface, (panel_x + 10, y_offset))
-            y_offset += 18
+            color = (255, 255, 100) if id(obj) in selected_ids else (180, 180, 180)
+            row = self.get_label(f"{i+1}. {texture_name[:15]} ({obj['x']:.0f}, {obj['z']:.0f})", color)
+            self.screen.blit(row, (panel_x + 10, y_offset))
+            y_offset += self.list_row_height
+        
+        # Barre de défilement
+        if len(items) > visible_rows > 0:
+            track_height = visible_rows * self.list_row_height
+            thumb_height = max(10, track_height * visible_rows // len(items))
+            thumb_y = self.list_rows_top + (track_height - thumb_height) * self.list_scroll // (len(items) - visible_rows)
+            pygame.draw.rect(self.screen, (120, 120, 120), (panel_x + panel_width - 8, thumb_y, 4, thumb_height))
     
     def draw_input_dialog(self):
         """Dessine la boîte de dialogue de saisie"""
@@ -531,6 +1061,17 @@ class MapEditor:
         # Dessine les objets
         self.draw_objects()
         
+        # Cercle du pinceau
+        if self.brush_mode:
+            brush_screen_radius = max(2, int(self.brush_radius * self.scale))
+            pygame.draw.circle(self.screen, (100, 200, 255), pygame.mouse.get_pos(), brush_screen_radius, 1)
+        
+        # Rectangle de sélection
+        if self.box_selecting:
+            (x1, y1), (x2, y2) = self.box_start, self.box_end
+            box = pygame.Rect(min(x1, x2), min(y1, y2), abs(x2 - x1), abs(y2 - y1))
+            pygame.draw.rect(self.screen, self.selected_color, box, 1)
+        
         # Dessine l'UI
         self.draw_ui()
         
@@ -539,23 +1080,30 @@ class MapEditor:
         
         pygame.display.flip()
     
-    def export_map(self):
-        """Exporte la map dans un fichier Python"""
-        filename = "map/map.py"
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write("\"\"\"Fichier de map pour D8 Engine\"\"\"\n")
-            f.write("from world import GameObject\n\n")
-            f.write("def load_map():\n")
-            f.write("    \"\"\"Retourne la liste des objets de la map\"\"\"\n")
-            f.write("    return [\n")
-            
-            for obj in self.objects:
-                f.write(f"        GameObject(\"{obj['texture']}\", x={obj['x']}, y={obj['y']}, z={obj['z']}, destroyable={obj['destroyable']}),\n")
-            
-            f.write("    ]\n")
-        
-        print(f"Map exported to {filename} with {len(self.objects)} objects!")
+    def build_export_snapshot(self):
+        """Instantané de la map : ordre des objets et valeurs des seuls objets modifiés depuis le dernier export
+
+        Aucun parcours des objets sur le thread de l'interface : la copie de la liste est faite
+        en C, et les lignes des objets inchangés sont dans le cache du thread d'export.
+        """
+        changes = self.export_changes
+        self.export_changes = {}
+        return tuple(self.objects), changes
+    
+    def export_map(self, filename="map/map.py"):
+        """Exporte la map dans un fichier Python, en arrière-plan"""
+        if self.map_loader:
+            # Map pas encore entièrement chargée : l'exporter maintenant l'écraserait par une partie
+            if self.pending_export != filename:
+                print(f"Export to {filename} deferred until the map has finished loading")
+            self.pending_export = filename
+            return
+        if self.exporter.busy():
+            # Un export est déjà en cours : on réessaiera à la fin de celui-ci
+            self.pending_export = filename
+            return
+        self.exporter.start(self.build_export_snapshot(), filename)
+        self.pending_export = None
     
     def run(self):
         """Boucle principale"""
@@ -565,10 +1113,19 @@ class MapEditor:
             self.update()
             self.draw()
         
+        # Termine les exports en cours avant de quitter
+        if self.exporter.busy():
+            self.exporter.thread.join()
+        if self.pending_export:
+            while self.map_loader:
+                self.load_map_step()
+            self.export_map(self.pending_export)
+            self.exporter.thread.join()
+        
         pygame.quit()
         sys.exit()
 
 
 if __name__ == "__main__":
-    editor = MapEditor()
+    editor = MapEditor(sys.argv[1] if len(sys.argv) > 1 else "map/map.py")
     editor.run()
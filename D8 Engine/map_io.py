@@ -0,0 +1,142 @@
+"""Module contenant l'écriture des fichiers de map (export atomique en arrière-plan)"""
+import os
+import re
+import threading
+import time
+
+
+MAP_HEADER = (
+    "\"\"\"Fichier de map pour D8 Engine\"\"\"\n"
+    "from world import GameObject\n\n"
+    "def load_map():\n"
+    "    \"\"\"Retourne la liste des objets de la map\"\"\"\n"
+    "    return [\n"
+)
+MAP_FOOTER = "    ]\n"
+
+# Calques de l'éditeur ; le calque par défaut n'est pas écrit dans le fichier
+LAYERS = ("scenery", "enemies", "items")
+DEFAULT_LAYER = "scenery"
+
+# Lecture sans exécution : une ligne GameObject(...) par objet. Le motif rapide reconnaît
+# les lignes écrites par format_object_line, le motif générique les lignes éditées à la main.
+CANONICAL_PATTERN = re.compile(r'GameObject\("([^"]*)", x=([^,]+), y=([^,]+), z=([^,]+), destroyable=(True|False)(?:, layer="([^"]*)")?(?:, yaw=([^,)]+))?\),$')
+OBJECT_PATTERN = re.compile(r'GameObject\(\s*"([^"]*)"\s*,(.*)\)')
+ARGUMENT_PATTERN = re.compile(r'(\w+)\s*=\s*("[^"]*"|[^,)]+)')
+
+
+def format_object_line(texture, x, y, z, destroyable, layer=DEFAULT_LAYER, yaw=0.0):
+    """Retourne la ligne de map.py décrivant un objet (calque et orientation seulement s'ils diffèrent du défaut)"""
+    extra = ""
+    if layer != DEFAULT_LAYER:
+        extra += f", layer=\"{layer}\""
+    if yaw:
+        extra += f", yaw={yaw}"
+    return f"        GameObject(\"{texture}\", x={x}, y={y}, z={z}, destroyable={destroyable}{extra}),\n"
+
+
+def parse_value(text):
+    """Convertit une valeur littérale de map.py (chaîne, booléen ou nombre)"""
+    text = text.strip()
+    if text.startswith('"'):
+        return text.strip('"')
+    if text in ('True', 'False'):
+        return text == 'True'
+    return float(text)
+
+
+def iter_map_objects(filename):
+    """Lit un fichier map.py ligne par ligne sans l'exécuter et produit un dictionnaire par objet"""
+    with open(filename, encoding='utf-8') as f:
+        for line in f:
+            obj = parse_object_line(line)
+            if obj is not None:
+                yield obj
+
+
+def parse_object_line(line):
+    """Retourne le dictionnaire de l'objet décrit par une ligne, ou None"""
+    match = CANONICAL_PATTERN.search(line)
+    if match:
+        texture, x, y, z, destroyable, layer, yaw = match.groups()
+        try:
+            return {'texture': texture, 'x': float(x), 'y': float(y), 'z': float(z),
+                    'destroyable': destroyable == 'True', 'layer': layer or DEFAULT_LAYER,
+                    'yaw': float(yaw) if yaw else 0.0}
+        except ValueError:
+            pass
+
+    match = OBJECT_PATTERN.search(line)
+    if not match:
+        return None
+    obj = {'texture': match.group(1), 'x': 0.0, 'y': 0.0, 'z': 0.0, 'destroyable': False, 'layer': DEFAULT_LAYER,
+           'yaw': 0.0}
+    try:
+        for key, value in ARGUMENT_PATTERN.findall(match.group(2)):
+            obj[key] = parse_value(value)
+    except ValueError:
+        print(f"Skipping unreadable map line: {line.strip()}")
+        return None
+    return obj
+
+
+class MapExporter:
+    """Écrit les maps sur un thread de travail : fichier temporaire puis renommage atomique"""
+    def __init__(self, chunk_size=5000):
+        self.chunk_size = chunk_size  # Lignes écrites entre deux mises à jour de la progression
+        self.thread = None
+        self.progress = 1.0
+        self.filename = None
+        self.last_message = ""
+        self.last_message_time = 0.0
+        self.lines = {}  # id(objet) -> ligne déjà formatée (lue et écrite par le seul thread d'export)
+
+    def busy(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, snapshot, filename):
+        """Lance l'écriture d'un instantané, retourne False si un export est déjà en cours
+
+        L'instantané est un couple (objets dans l'ordre, {id objet: valeurs}) : le thread formate
+        les objets modifiés et reprend sa ligne en cache pour tous les autres.
+        """
+        if self.busy():
+            return False
+        self.progress = 0.0
+        self.filename = filename
+        self.thread = threading.Thread(target=self._write, args=(snapshot, filename), daemon=True)
+        self.thread.start()
+        return True
+
+    def _write(self, snapshot, filename):
+        objects, changes = snapshot
+        cache = self.lines
+        lines = []
+        current = {}  # Les objets supprimés depuis l'export précédent sortent du cache
+        for obj in objects:
+            obj_id = id(obj)
+            values = changes.get(obj_id)
+            line = format_object_line(*values) if values is not None else cache[obj_id]
+            current[obj_id] = line
+            lines.append(line)
+        self.lines = current
+
+        temp_filename = filename + ".tmp"
+        try:
+            with open(temp_filename, 'w', encoding='utf-8') as f:
+                f.write(MAP_HEADER)
+                total = max(1, len(lines))
+                for start in range(0, len(lines), self.chunk_size):
+                    f.write("".join(lines[start:start + self.chunk_size]))
+                    self.progress = min(1.0, (start + self.chunk_size) / total)
+                f.write(MAP_FOOTER)
+                f.flush()
+                os.fsync(f.fileno())
+            # Le fichier précédent reste intact tant que le nouveau n'est pas complet
+            os.replace(temp_filename, filename)
+            self.last_message = f"Map exported to {filename} with {len(lines)} objects!"
+        except OSError as error:
+            self.last_message = f"Export to {filename} failed: {error}"
+        self.progress = 1.0
+        self.last_message_time = time.time()
+        print(self.last_message)
@@ -0,0 +1,129 @@
+"""Module contenant l'élimination des objets cachés derrière des sprites plus proches"""
+import math
+import numpy as np
+import pygame
+
+
+def opaque_rect(image, grid=16, threshold=250):
+    """Retourne le plus grand rectangle entièrement opaque de l'image, en fractions (x0, y0, x1, y1), ou None
+
+    L'image est découpée en grid x grid cellules ; une cellule ne compte que si tous ses
+    pixels sont opaques, le rectangle est donc toujours une sous-estimation.
+    """
+    width, height = image.get_size()
+    if not image.get_flags() & pygame.SRCALPHA:
+        return 0.0, 0.0, 1.0, 1.0
+    if width < grid or height < grid:
+        return None
+    alpha = pygame.surfarray.array_alpha(image)  # Indexé [x, y]
+    # Bornes des cellules (la dernière rangée/colonne peut être plus grande)
+    x_edges = np.linspace(0, width, grid + 1).astype(int)
+    y_edges = np.linspace(0, height, grid + 1).astype(int)
+    column_min = np.minimum.reduceat(alpha, x_edges[:-1], axis=0)
+    cells = np.minimum.reduceat(column_min, y_edges[:-1], axis=1) >= threshold  # [colonne, rangée]
+
+    # Plus grand rectangle de cellules opaques (méthode des histogrammes, rangée par rangée)
+    best = (0, None)
+    heights = np.zeros(grid, dtype=int)
+    for row in range(grid):
+        heights = np.where(cells[:, row], heights + 1, 0)
+        stack = []
+        for column in range(grid + 1):
+            current = heights[column] if column < grid else 0
+            start = column
+            while stack and stack[-1][1] >= current:
+                start, bar = stack.pop()
+                area = bar * (column - start)
+                if area > best[0]:
+                    best = (area, (start, row - bar + 1, column, row + 1))
+            stack.append((start, current))
+    if best[1] is None:
+        return None
+    x0, y0, x1, y1 = best[1]
+    return (float(x_edges[x0] / width), float(y_edges[y0] / height),
+            float(x_edges[x1] / width), float(y_edges[y1] / height))
+
+
+class OcclusionBuffer:
+    """Tampon de couverture par colonnes de l'écran (une plage verticale couverte par colonne)
+
+    Les objets sont traités du plus proche au plus loin : un objet dont le rectangle est
+    entièrement couvert par les parties opaques des objets déjà traités est caché, et n'a
+    besoin ni d'être redimensionné ni d'être dessiné.
+    """
+    def __init__(self, column_width=8):
+        self.column_width = column_width
+        self.size = (0, 0)
+        self.top = np.zeros(0)
+        self.bottom = np.zeros(0)
+        self.depth = np.zeros(0)  # Profondeur (axe de la caméra) de l'objet le plus loin de la plage couverte
+        self.hidden_count = 0  # Objets cachés lors du dernier passage
+
+    def reset(self, size):
+        """Vide la couverture pour une surface du monde de la taille donnée"""
+        if size != self.size:
+            self.size = size
+            columns = -(-size[0] // self.column_width)
+            self.top = np.empty(columns)
+            self.bottom = np.empty(columns)
+            self.depth = np.empty(columns)
+        self.top.fill(np.inf)
+        self.bottom.fill(-np.inf)
+        self.depth.fill(np.inf)
+
+    def is_hidden(self, x0, y0, x1, y1):
+        """Vrai si le rectangle (pixels de la surface du monde) est entièrement couvert ou hors de l'écran"""
+        width, height = self.size
+        x0, y0, x1, y1 = max(x0, 0), max(y0, 0), min(x1, width), min(y1, height)
+        if x0 >= x1 or y0 >= y1:
+            return True
+        # Toutes les colonnes touchées, même partiellement
+        first = int(x0) // self.column_width
+        last = -(-int(math.ceil(x1)) // self.column_width)
+        return bool((self.top[first:last] <= y0).all() and (self.bottom[first:last] >= y1).all())
+
+    def cover(self, x0, y0, x1, y1, depth=0.0):
+        """Ajoute une zone opaque à la profondeur donnée ; seules les colonnes entièrement recouvertes en largeur comptent
+
+        Une plage fusionnée garde la plus grande profondeur de ses objets : un point n'est
+        caché que s'il est derrière tous (estimation prudente).
+        """
+        first = -(-int(math.ceil(x0)) // self.column_width)
+        last = int(x1) // self.column_width
+        if first >= last or y0 >= y1:
+            return
+        top = self.top[first:last]
+        bottom = self.bottom[first:last]
+        depths = self.depth[first:last]
+        # Plages qui se touchent : fusion ; sinon on garde la plus haute des deux
+        merge = (y0 <= bottom) & (y1 >= top)
+        replace = ~merge & (y1 - y0 > bottom - top)
+        np.minimum(top, y0, out=top, where=merge)
+        np.maximum(bottom, y1, out=bottom, where=merge)
+        np.maximum(depths, depth, out=depths, where=merge)
+        top[replace] = y0
+        bottom[replace] = y1
+        depths[replace] = depth
+
+    def cull(self, objects, ground_offset, viewport):
+        """Retourne les objets visibles non cachés, du plus proche au plus loin
+
+        objects doit être trié du plus proche au plus loin ; chaque objet fournit get_draw_rect(),
+        occluder (rectangle opaque de son image en fractions) et un prototype (occludes).
+        """
+        self.reset(viewport.render_size)
+        drawn = []
+        for obj in objects:
+            rect = obj.get_draw_rect(ground_offset, viewport)
+            if rect is None:
+                continue
+            x, y, width, height = rect
+            if self.is_hidden(x, y, x + width, y + height):
+                continue
+            drawn.append(obj)
+            if obj.prototype.occludes and obj.occluder:
+                left, top, right, bottom = obj.occluder
+                self.cover(x + left * width, y + top * height, x + right * width, y + bottom * height,
+                           viewport.focal_length / obj.scale)
+        self.hidden_count = len(objects) - len(drawn)
+        return drawn
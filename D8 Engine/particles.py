@@ -0,0 +1,205 @@
+"""Module contenant le système de particules (impacts, tirs) stocké dans des tableaux NumPy"""
+import math
+import numpy as np
+import pygame
+from world import DEFAULT_VIEWPORT
+
+
+class ParticleSystem:
+    """Pool de particules à capacité fixe, intégré en une seule passe vectorisée par frame"""
+    def __init__(self, capacity=4096, gravity=-900.0, ground_level=-60.0, seed=None, output_slots=3):
+        self.capacity = capacity
+        self.gravity = gravity  # Unités 3D par seconde²
+        self.ground_level = ground_level  # Les particules s'arrêtent à cette hauteur
+
+        # Stockage du pool (alloué une seule fois)
+        self.position = np.zeros((capacity, 3), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 3), dtype=np.float32)
+        self.lifetime = np.zeros(capacity, dtype=np.float32)  # Temps restant (<= 0 = morte)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+
+        # Buffers de travail réutilisés à chaque frame
+        self._step = np.zeros((capacity, 3), dtype=np.float32)
+        self._rel = np.zeros((capacity, 3), dtype=np.float32)
+        self._rot_x = np.zeros(capacity, dtype=np.float32)
+        self._rot_z = np.zeros(capacity, dtype=np.float32)
+        self._tmp = np.zeros(capacity, dtype=np.float32)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._grounded = np.zeros(capacity, dtype=bool)
+        self._random = np.zeros((capacity, 3), dtype=np.float32)
+        self._visible = np.zeros(capacity, dtype=bool)
+        self._scale = np.zeros(capacity, dtype=np.float32)
+        self._screen_x = np.zeros(capacity, dtype=np.float32)
+        self._screen_y = np.zeros(capacity, dtype=np.float32)
+        self._column = np.zeros(capacity, dtype=np.intp)
+        self._cover = np.zeros(capacity, dtype=np.float64)
+        self._covered = np.zeros(capacity, dtype=bool)
+        self._test = np.zeros(capacity, dtype=bool)
+
+        # Sorties de project : un emplacement par instantané (les instantanés publiés restent intacts),
+        # coordonnées en intp pour indexer les pixels sans conversion au dessin
+        self.outputs = [(np.zeros(capacity, dtype=np.intp), np.zeros(capacity, dtype=np.intp),
+                         np.zeros((capacity, 3), dtype=np.uint8)) for _ in range(output_slots)]
+
+        self.next_index = 0  # Prochain emplacement du buffer circulaire
+        self.rng = np.random.default_rng(seed)
+
+    def emit(self, x, y, z, count, color, speed=250.0, lifetime=0.6, spread=1.0, direction=(0.0, 1.0, 0.0)):
+        """Émet une gerbe de particules depuis un point 3D (écrase les plus anciennes si le pool est plein)"""
+        count = min(count, self.capacity)
+        start = self.next_index
+        end = start + count
+        if end <= self.capacity:
+            slots = slice(start, end)
+            self._emit_slice(slots, count, x, y, z, color, speed, lifetime, spread, direction)
+        else:
+            # Le bloc déborde : on le coupe en deux à la fin du buffer circulaire
+            first = self.capacity - start
+            self._emit_slice(slice(start, self.capacity), first, x, y, z, color, speed, lifetime, spread, direction)
+            self._emit_slice(slice(0, count - first), count - first, x, y, z, color, speed, lifetime, spread, direction)
+        self.next_index = end % self.capacity
+
+    def _emit_slice(self, slots, count, x, y, z, color, speed, lifetime, spread, direction):
+        """Initialise un bloc contigu du pool"""
+        random = self._random[:count]
+        self.rng.random(dtype=np.float32, out=random)
+        random -= 0.5
+        random *= 2.0 * spread
+        random += direction
+
+        self.position[slots] = (x, y, z)
+        np.multiply(random, speed, out=self.velocity[slots])
+        self.color[slots] = color
+
+        # Légère variation de durée de vie (75% à 125%) pour éviter que tout disparaisse d'un coup
+        lifetimes = self.lifetime[slots]
+        self.rng.random(dtype=np.float32, out=lifetimes)
+        lifetimes *= 0.5
+        lifetimes += 0.75
+        lifetimes *= lifetime
+
+    def update(self, delta_time):
+        """Intègre toutes les particules en une passe vectorisée, sans allocation"""
+        self.lifetime -= delta_time
+        np.greater(self.lifetime, 0.0, out=self._alive)
+
+        self.velocity[:, 1] += self.gravity * delta_time
+        np.multiply(self.velocity, delta_time, out=self._step)
+        self.position += self._step
+
+        # Les particules touchant le sol y restent immobiles
+        heights = self.position[:, 1]
+        np.less(heights, self.ground_level, out=self._grounded)
+        np.maximum(heights, self.ground_level, out=heights)
+        np.copyto(self.velocity, 0.0, where=self._grounded[:, None])
+
+    def active_count(self):
+        """Retourne le nombre de particules vivantes"""
+        return int(np.count_nonzero(self._alive))
+
+    def project(self, camera_x, camera_y, camera_z, camera_angle, ground_offset=0, viewport=DEFAULT_VIEWPORT,
+                occlusion=None, slot=0):
+        """Projette les particules vivantes (même projection que project_3d_to_2d), sans allocation
+
+        Retourne (x, y, couleurs) en pixels de la surface du monde, vues sur l'emplacement de
+        sortie slot (inchangé tant que la simulation ne réutilise pas cet emplacement), ou None
+        si rien n'est visible. Seules les particules dont le carré tient dans la surface sont gardées. Avec un tampon d'occlusion rempli pour cette frame, les particules
+        derrière les parties opaques des objets plus proches sont retirées.
+        """
+        if not self._alive.any():
+            return None
+
+        np.subtract(self.position, (camera_x, camera_y, camera_z), out=self._rel)
+        # Rotation autour de l'axe Y d'un angle -camera_angle
+        cos_a = math.cos(-camera_angle)
+        sin_a = math.sin(-camera_angle)
+        rel_x = self._rel[:, 0]
+        rel_z = self._rel[:, 2]
+        np.multiply(rel_x, cos_a, out=self._rot_x)
+        np.multiply(rel_z, sin_a, out=self._tmp)
+        self._rot_x -= self._tmp
+        np.multiply(rel_x, sin_a, out=self._rot_z)
+        np.multiply(rel_z, cos_a, out=self._tmp)
+        self._rot_z += self._tmp
+
+        visible = self._visible
+        np.greater(self._rot_z, 0.1, out=visible)
+        visible &= self._alive
+        if not visible.any():
+            return None
+
+        # Projection directement à la résolution de la surface du monde (toutes les cases du pool,
+        # les particules invisibles gardent des valeurs sans objet, retirées à la fin)
+        render_scale = viewport.render_scale
+        scale = self._scale
+        np.divide(viewport.focal_length * render_scale, self._rot_z, out=scale, where=visible)
+        np.multiply(self._rot_x, scale, out=self._screen_x)
+        self._screen_x += viewport.center_x * render_scale
+        np.multiply(self._rel[:, 1], scale, out=self._screen_y)
+        np.subtract((viewport.center_y + ground_offset) * render_scale, self._screen_y, out=self._screen_y)
+
+        # Coupées aux bords de la surface (les coordonnées entières sont tronquées vers zéro)
+        width, height = viewport.render_size
+        for coordinate, limit in ((self._screen_x, width), (self._screen_y, height)):
+            np.greater(coordinate, -1, out=self._test)
+            visible &= self._test
+            np.less(coordinate, limit - 1, out=self._test)
+            visible &= self._test
+
+        if occlusion is not None and occlusion.top.size:
+            # Cachées si dans la plage couverte de leur colonne et plus loin que ce qui la couvre
+            column = self._column
+            np.floor_divide(self._screen_x, occlusion.column_width, out=self._tmp)
+            np.clip(self._tmp, 0, occlusion.top.size - 1, out=self._tmp)
+            np.copyto(column, self._tmp, casting="unsafe")
+            covered = self._covered
+            np.take(occlusion.top, column, out=self._cover)
+            np.greater_equal(self._screen_y, self._cover, out=covered)
+            np.take(occlusion.bottom, column, out=self._cover)
+            self._cover -= 2  # Carré de 2x2 pixels
+            np.less_equal(self._screen_y, self._cover, out=self._test)
+            covered &= self._test
+            np.take(occlusion.depth, column, out=self._cover)
+            np.greater(self._rot_z, self._cover, out=self._test)
+            covered &= self._test
+            np.logical_not(covered, out=covered)
+            visible &= covered
+            count = int(np.count_nonzero(visible))
+            if not count:
+                return None
+        else:
+            count = int(np.count_nonzero(visible))
+
+        screen_x, screen_y, colors = self.outputs[slot]
+        screen_x, screen_y, colors = screen_x[:count], screen_y[:count], colors[:count]
+        np.copyto(screen_x, np.compress(visible, self._screen_x, out=self._tmp[:count]), casting="unsafe")
+        np.copyto(screen_y, np.compress(visible, self._screen_y, out=self._tmp[:count]), casting="unsafe")
+        np.compress(visible, self.color, axis=0, out=colors)
+        return screen_x, screen_y, colors
+
+    def draw(self, screen, camera_x, camera_y, camera_z, camera_angle, ground_offset=0, viewport=DEFAULT_VIEWPORT):
+        """Projette les particules vivantes et les écrit dans l'écran"""
+        draw_particles(screen, self.project(camera_x, camera_y, camera_z, camera_angle, ground_offset, viewport))
+
+
+def draw_particles(screen, projected):
+    """Écrit des particules projetées (résultat de ParticleSystem.project) en carrés de 2x2 pixels
+
+    Les particules sont déjà coupées aux bords par project : aucun masque ni copie ici, les
+    trois autres pixels du carré sont écrits par des vues décalées d'un pixel.
+    """
+    if projected is None:
+        return
+    screen_x, screen_y, colors = projected
+
+    pixels = pygame.surfarray.pixels3d(screen)
+    for view in (pixels, pixels[1:], pixels[:, 1:], pixels[1:, 1:]):
+        view[screen_x, screen_y] = colors
+    del pixels, view  # Libère le verrou de la surface
+
+    if screen.get_flags() & pygame.SRCALPHA:
+        # Calque transparent (backend SDL2) : les particules doivent aussi être opaques
+        alpha = pygame.surfarray.pixels_alpha(screen)
+        for view in (alpha, alpha[1:], alpha[:, 1:], alpha[1:, 1:]):
+            view[screen_x, screen_y] = 255
+        del alpha, view
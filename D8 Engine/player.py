@@ -1,19 +1,25 @@
 """Module contenant les classes liées au joueur, armes et inventaire"""
 import pygame
-from audioplayer import AudioPlayer
 import math
+from audio import get_audio_manager, PRIORITY_WEAPON, PRIORITY_PLAYER
+from world import DEFAULT_VIEWPORT
 
 
 class Weapon:
     """Classe de base pour les armes"""
-    def __init__(self, name, image_path, fire_image_path=None, sound_path=None):
+    def __init__(self, name, image_path, fire_image_path=None, sound_path=None, viewport=DEFAULT_VIEWPORT,
+                 bottom_offset=295, raise_limit=55):
         self.name = name
         self.image = pygame.image.load(image_path).convert_alpha()
         self.fire_image = pygame.image.load(fire_image_path).convert_alpha() if fire_image_path else None
-        self.sound = AudioPlayer(sound_path) if sound_path else None
-        self.x = 350
-        self.y = 305
-        self.base_y = 305  # Base Y position for recoil
+        self.sound = get_audio_manager().load(sound_path) if sound_path else None
+        self.viewport = viewport
+        # Position de repos : à gauche du centre, posée sur le bas de l'écran (l'image n'est pas redimensionnée)
+        self.rest_x = viewport.center_x - 150
+        self.base_y = viewport.height - bottom_offset  # Base Y position (recoil, weapon switch)
+        self.raise_limit = raise_limit  # Pixels above the base when looking up
+        self.x = self.rest_x
+        self.y = self.base_y
         self.is_firing = False
         self.fire_timer = 0.0  # Timer en secondes
         self.fire_duration = 0.3  # Durée du flash de tir (0.3 secondes)
@@ -24,7 +30,7 @@ class Weapon:
     def fire(self):
         """Tire avec l'arme"""
         if self.sound:
-            self.sound.play()
+            get_audio_manager().play(self.sound, priority=PRIORITY_WEAPON)
         self.is_firing = True
         self.fire_timer = 0.0
         self.recoil_offset = 15  # Start recoil
@@ -43,44 +49,48 @@ class Weapon:
             if self.recoil_offset < 0:
                 self.recoil_offset = 0
             
-    def draw(self, screen):
-        """Dessine l'arme"""
+    def get_sprite(self):
+        """Retourne (image, position) de l'arme telle qu'elle doit être dessinée"""
         # Apply recoil offset
         draw_y = self.y + int(self.recoil_offset)
         if self.is_firing and self.fire_image:
-            screen.blit(self.fire_image, (self.x, draw_y))
-        else:
-            screen.blit(self.image, (self.x, draw_y))
+            return self.fire_image, (self.x, draw_y)
+        return self.image, (self.x, draw_y)
+            
+    def draw(self, screen):
+        """Dessine l'arme"""
+        screen.blit(*self.get_sprite())
             
-    def update_position(self, mouse_x, mouse_y, base_y):
-        """Met à jour la position de l'arme selon la souris"""
+    def update_position(self, mouse_x, mouse_y):
+        """Met à jour la position de l'arme selon la souris (zones en fractions de l'écran)"""
+        width, height = self.viewport.width, self.viewport.height
         # Mouvement vertical
-        if mouse_y < 250:
-            if self.y > base_y - 55:
+        if mouse_y < height * 5 / 12:
+            if self.y > self.base_y - self.raise_limit:
                 self.y -= 1
-        elif mouse_y > 360:
-            if self.y < base_y + 15:
+        elif mouse_y > height * 0.6:
+            if self.y < self.base_y + 15:
                 self.y += 1
         
         # Mouvement horizontal
-        if mouse_x >= 600:
-            if self.x < 430:
+        if mouse_x >= width * 0.6:
+            if self.x < self.rest_x + 80:
                 self.x += 1
-        elif mouse_x <= 365:
-            if self.x > 320:
+        elif mouse_x <= width * 0.365:
+            if self.x > self.rest_x - 30:
                 self.x -= 1
 
 
 class Gun(Weapon):
     """Classe pour le pistolet"""
-    def __init__(self):
+    def __init__(self, viewport=DEFAULT_VIEWPORT):
         super().__init__(
             "Pistolet",
             "assets/gun.png",
             "assets/gunfire.png",
-            "assets/fire.mp3"
+            "assets/fire.mp3",
+            viewport
         )
-        self.y = 305
         self.munitions = 10
         self.max_munitions = 10
         self.reserve_ammo = 30  # Reserve ammunition
@@ -120,41 +130,25 @@ class Gun(Weapon):
                 self.reserve_ammo -= ammo_to_load
                 self.is_reloading = False
                 self.reload_timer = 0.0
-        
-    def update_position(self, mouse_x, mouse_y):
-        super().update_position(mouse_x, mouse_y, 305)
 
 
 class Bow(Weapon):
     """Classe pour l'arc"""
-    def __init__(self):
+    def __init__(self, viewport=DEFAULT_VIEWPORT):
+        # Grande image qui dépasse du bas de l'écran, et se lève plus haut que le pistolet
         super().__init__(
             "Arc",
-            "assets/arc.png"
+            "assets/arc.png",
+            viewport=viewport,
+            bottom_offset=565,
+            raise_limit=115
         )
-        self.y = 35
-        
-    def update_position(self, mouse_x, mouse_y):
-        # Mouvement vertical spécifique à l'arc
-        if mouse_y < 250:
-            if self.y > -80:
-                self.y -= 1
-        elif mouse_y > 360:
-            if self.y < 50:
-                self.y += 1
-        
-        # Mouvement horizontal
-        if mouse_x >= 600:
-            if self.x < 430:
-                self.x += 1
-        elif mouse_x <= 365:
-            if self.x > 320:
-                self.x -= 1
 
 
 class Inventory:
     """Classe pour gérer l'inventaire d'armes"""
-    def __init__(self):
+    def __init__(self, viewport=DEFAULT_VIEWPORT):
+        self.viewport = viewport  # Les armes sortent par le bas de l'écran
         self.weapons = []
         self.current_weapon_index = 0
         self.switching_animation = {
@@ -211,11 +205,8 @@ class Inventory:
                 # Animation de descente de l'arme actuelle
                 from_weapon = self.switching_animation['from_weapon']
                 progress = self.switching_animation['timer'] / self.switch_duration
-                
-                if isinstance(from_weapon, Gun):
-                    from_weapon.y = 305 + (600 - 305) * progress
-                elif isinstance(from_weapon, Bow):
-                    from_weapon.y = 35 + (600 - 35) * progress
+                bottom = self.viewport.height
+                from_weapon.y = from_weapon.base_y + (bottom - from_weapon.base_y) * progress
                     
                 if self.switching_animation['timer'] >= self.switch_duration:
                     self.switching_animation['phase'] = 'up'
@@ -225,23 +216,18 @@ class Inventory:
                 # Animation de montée de la nouvelle arme
                 to_weapon = self.switching_animation['to_weapon']
                 progress = self.switching_animation['timer'] / self.switch_duration
-                
-                if isinstance(to_weapon, Gun):
-                    to_weapon.y = 600 - (600 - 305) * progress
-                elif isinstance(to_weapon, Bow):
-                    to_weapon.y = 600 - (600 - 35) * progress
+                bottom = self.viewport.height
+                to_weapon.y = bottom - (bottom - to_weapon.base_y) * progress
                     
                 if self.switching_animation['timer'] >= self.switch_duration:
-                    if isinstance(to_weapon, Gun):
-                        to_weapon.y = 305
-                    elif isinstance(to_weapon, Bow):
-                        to_weapon.y = 35
+                    to_weapon.y = to_weapon.base_y
                     self.switching_animation['active'] = False
 
 
 class Camera:
     """Classe pour gérer la caméra et le défilement"""
-    def __init__(self):
+    def __init__(self, viewport=DEFAULT_VIEWPORT):
+        self.viewport = viewport  # Zones de défilement en fractions de la hauteur de l'écran
         self.ground_y = 0
         self.saved_ground_y = 0  # Sauvegarde de la position avant le saut
         self.is_crouching = False  # État d'accroupissement
@@ -264,8 +250,8 @@ class Camera:
         self.jump_gravity = -1000.0  # Gravité augmentée
         self.jump_force = 450.0  # Force de saut augmentée pour être plus visible
         
-        self.jump_sound = AudioPlayer("assets/jump.wav")
-        self.landing_sound = AudioPlayer("assets/landing.wav")
+        self.jump_sound = get_audio_manager().load("assets/jump.wav")
+        self.landing_sound = get_audio_manager().load("assets/landing.wav")
         
     def update_scroll(self, mouse_y):
         """Met à jour le défilement vertical selon la souris avec paliers de vitesse"""
@@ -273,21 +259,22 @@ class Camera:
         if self.jump_state != 'idle' or self.is_crouching:
             return
             
-        # Paliers pour regarder vers le haut (y < 300)
-        if mouse_y < 150:  # Zone rapide
+        mouse_y /= self.viewport.height
+        # Paliers pour regarder vers le haut (moitié supérieure)
+        if mouse_y < 0.25:  # Zone rapide
             scroll_speed = 3.0
-        elif mouse_y < 250:  # Zone moyenne
+        elif mouse_y < 5 / 12:  # Zone moyenne
             scroll_speed = 1.5
-        elif mouse_y < 300:  # Zone lente
+        elif mouse_y < 0.5:  # Zone lente
             scroll_speed = 0.6
-        # Paliers pour regarder vers le bas (y > 300)
-        elif mouse_y > 450:  # Zone rapide
+        # Paliers pour regarder vers le bas (moitié inférieure)
+        elif mouse_y > 0.75:  # Zone rapide
             scroll_speed = -3.0
-        elif mouse_y > 375:  # Zone moyenne
+        elif mouse_y > 0.625:  # Zone moyenne
             scroll_speed = -1.5
-        elif mouse_y > 300:  # Zone lente
+        elif mouse_y > 0.5:  # Zone lente
             scroll_speed = -0.6
-        else:  # Zone centrale (300-300) - pas de mouvement
+        else:  # Centre exact - pas de mouvement
             scroll_speed = 0
             
         # Applique le scroll avec les limites
@@ -355,7 +342,7 @@ class Camera:
                 self.jump_state = 'jumping'
                 self.jump_velocity = self.jump_force
                 self.ground_y = self.saved_ground_y  # Repart de la position sauvée
-                self.jump_sound.play()
+                get_audio_manager().play(self.jump_sound, priority=PRIORITY_PLAYER)
                     
         elif self.jump_state == 'jumping' or self.jump_state == 'descending':
             # Physique de saut avec gravité
@@ -371,7 +358,7 @@ class Camera:
                 self.ground_y = self.saved_ground_y  # Retourne à la position sauvée
                 self.jump_velocity = 0
                 self.jump_state = 'idle'
-                self.landing_sound.play()
+                get_audio_manager().play(self.landing_sound, priority=PRIORITY_PLAYER)
     
     def update_head_bob(self, delta_time, is_moving, is_sprinting):
         """Met à jour l'animation de balancement de tête pendant le sprint"""
@@ -390,7 +377,8 @@ class Camera:
 
 class Player:
     """Classe pour gérer le joueur et ses mouvements en 3D"""
-    def __init__(self):
+    def __init__(self, viewport=DEFAULT_VIEWPORT):
+        self.viewport = viewport  # Zones de rotation en fractions de la largeur de l'écran
         self.x = 0.0  # Position X (gauche/droite)
         self.y = 0.0  # Position Y (haut/bas)
         self.z = 0.0  # Position Z (profondeur)
@@ -470,26 +458,27 @@ class Player:
     def update_head_rotation(self, mouse_x):
         """Met à jour la rotation de la tête selon la position de la souris avec plusieurs paliers"""
         # Système à 4 paliers de rotation
+        mouse_x /= self.viewport.width
         
         # Bords extrêmes : rotation rapide
-        if mouse_x > 850:
+        if mouse_x > 0.85:
             self.angle -= 0.04  # Rotation rapide à droite
-        elif mouse_x < 150:
+        elif mouse_x < 0.15:
             self.angle += 0.04  # Rotation rapide à gauche
             
         # Zone proche des bords : rotation moyenne
-        elif mouse_x > 700:
+        elif mouse_x > 0.7:
             self.angle -= 0.02  # Rotation moyenne à droite
-        elif mouse_x < 300:
+        elif mouse_x < 0.3:
             self.angle += 0.02  # Rotation moyenne à gauche
             
         # Zone intermédiaire : rotation lente
-        elif mouse_x > 600:
+        elif mouse_x > 0.6:
             self.angle -= 0.008  # Rotation lente à droite
-        elif mouse_x < 400:
+        elif mouse_x < 0.4:
             self.angle += 0.008  # Rotation lente à gauche
             
-        # Centre (400-600) : pas de rotation
+        # Centre (40-60 % de la largeur) : pas de rotation
         
     def update(self, camera=None):
         """Met à jour la position du joueur en 3D"""
@@ -539,18 +528,26 @@ class Player:
         self.x += forward_x * self.speed_forward + strafe_x * self.speed_strafe
         self.z += forward_z * self.speed_forward + strafe_z * self.speed_strafe
     
-    def check_collision(self, objects, collision_radius=100):
-        """Check collision with objects and prevent movement through them"""
+    def check_collision(self, objects, collision_radius=None):
+        """Check collision with objects and prevent movement through them
+
+        Each texture has its own radius (prototype), unless collision_radius is given.
+        """
         for obj in objects:
+            prototype = obj.prototype
+            if not prototype.solid:
+                continue
+            radius = collision_radius or prototype.collision_radius
+            
             # Calculate distance to object
             dx = self.x - obj.x
             dz = self.z - obj.z
             distance = math.sqrt(dx*dx + dz*dz)
             
-            if distance < collision_radius:
+            if distance < radius:
                 # Push player away from object
                 if distance > 0:
-                    push_x = (dx / distance) * (collision_radius - distance)
-                    push_z = (dz / distance) * (collision_radius - distance)
+                    push_x = (dx / distance) * (radius - distance)
+                    push_z = (dz / distance) * (radius - distance)
                     self.x += push_x
                     self.z += push_z
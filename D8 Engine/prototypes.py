@@ -0,0 +1,154 @@
+"""Module contenant le registre des textures d'objets et de leurs données dérivées"""
+import json
+import math
+import os
+import pygame
+from occlusion import opaque_rect
+from shadows import ground_footprint
+
+COLLISION_RADIUS = 100  # Rayon de collision par défaut d'un objet (modifiable par le fichier annexe de sa texture)
+LOD_MIN_PIXELS = 8  # En dessous de cette taille affichée, l'ombre d'un objet est omise
+EDGE_ON_WIDTH = 0.15  # Largeur minimale (fraction) d'une image générée vue par la tranche
+
+# Champs modifiables par le fichier annexe d'une texture (ex: assets/tree.json)
+OVERRIDABLE = ("anchor_factor", "collision_radius", "hitbox", "shadow_scale",
+               "solid", "casts_shadow", "occludes", "directions", "direction_frames")
+
+
+def visible_rect(image, min_alpha=128):
+    """Rectangle visible d'une image (gauche, haut, droite, bas), en fractions de l'image"""
+    width, height = image.get_size()
+    bounds = image.get_bounding_rect(min_alpha)
+    if not bounds.width or not bounds.height:
+        return (0.0, 0.0, 1.0, 1.0)
+    return bounds.left / width, bounds.top / height, bounds.right / width, bounds.bottom / height
+
+
+def mirror_rect(rect):
+    """Rectangle (fractions) d'une image retournée horizontalement, ou None"""
+    if not rect:
+        return rect
+    left, top, right, bottom = rect
+    return (1 - right, top, 1 - left, bottom)
+
+
+class TexturePrototype:
+    """Données d'une texture d'objet, calculées une seule fois au chargement et partagées par ses objets"""
+    def __init__(self, prototype_id, path):
+        self.id = prototype_id
+        self.path = path
+        self.image = pygame.image.load(path).convert_alpha()
+        self.width, self.height = self.image.get_size()
+
+        # Ancrage au sol : les grandes images ont plus de marge transparente en bas
+        self.anchor_factor = 0.4 if self.height > 400 else 0.25
+
+        # Rectangle visible (fractions de l'image) pour la visée
+        self.hitbox = visible_rect(self.image)
+
+        # Occlusion et ombre
+        self.occluder = opaque_rect(self.image)
+        self.footprint = ground_footprint(self.image)
+        footprint_width = self.footprint[2] * self.width if self.footprint else self.width / 2
+        self.collision_radius = COLLISION_RADIUS  # Unités du monde (pas des pixels de l'image)
+
+        # Niveau de détail (échelle d'affichage bornée) : en dessous, pas d'ombre. L'objet lui-même
+        # n'est jamais omis : l'échelle bornée à 0.1 lui garde toujours plusieurs dizaines de pixels
+        self.shadow_scale = LOD_MIN_PIXELS / footprint_width
+
+        # Options par défaut
+        self.solid = True  # Bloque le joueur
+        self.casts_shadow = self.footprint is not None
+        self.occludes = self.occluder is not None  # Peut cacher les objets derrière lui
+
+        # Orientation : 1 = toujours face à la caméra ; sinon une image par direction de vue
+        self.directions = 1
+        self.direction_frames = None  # Chemins d'images dessinées pour chaque direction (facultatif)
+
+        self._apply_overrides(os.path.splitext(path)[0] + ".json")
+        self.frames = self._build_frames()
+
+    def _apply_overrides(self, sidecar_path):
+        """Applique les valeurs du fichier annexe de la texture, s'il existe"""
+        try:
+            with open(sidecar_path, encoding="utf-8") as f:
+                overrides = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as error:
+            print(f"Prototype {self.path}: cannot read {sidecar_path} ({error})")
+            return
+        for key, value in overrides.items():
+            if key not in OVERRIDABLE:
+                print(f"Prototype {self.path}: unknown field '{key}' in {sidecar_path}")
+                continue
+            setattr(self, key, tuple(value) if isinstance(value, list) else value)
+        if not self.occluder:
+            self.occludes = False
+        if not self.footprint:
+            self.casts_shadow = False
+        try:
+            self.directions = int(self.directions)
+        except (TypeError, ValueError):
+            self.directions = 0
+        if self.directions < 1:
+            print(f"Prototype {self.path}: 'directions' must be a whole number >= 1 in {sidecar_path}")
+            self.directions = 1
+
+    def _build_frames(self):
+        """Retourne les (image, rectangle opaque, hit-box, emprise au sol) de chaque direction
+
+        Calculées une seule fois. La direction k correspond à une caméra placée à
+        k * 360 / directions degrés de la face avant de l'objet. Sans images dédiées, chaque
+        direction est générée en tournant l'image plane autour de l'axe vertical : largeur
+        réduite de |cos| (les fractions ne changent pas), retournée vue de dos.
+        """
+        if self.direction_frames:
+            self.directions = len(self.direction_frames)
+            frames = []
+            for frame_path in self.direction_frames:
+                image = pygame.image.load(frame_path).convert_alpha()
+                frames.append((image, opaque_rect(image), visible_rect(image), ground_footprint(image)))
+            return frames
+
+        frames = [(self.image, self.occluder, self.hitbox, self.footprint)]
+        for index in range(1, self.directions):
+            cos_view = math.cos(2 * math.pi * index / self.directions)
+            width = max(1, round(self.width * max(abs(cos_view), EDGE_ON_WIDTH)))
+            image = pygame.transform.smoothscale(self.image, (width, self.height))
+            occluder, hitbox, footprint = self.occluder, self.hitbox, self.footprint
+            if cos_view < 0:
+                image = pygame.transform.flip(image, True, False)
+                occluder, hitbox = mirror_rect(occluder), mirror_rect(hitbox)
+                if footprint:
+                    center_x, bottom, footprint_width = footprint
+                    footprint = (1 - center_x, bottom, footprint_width)
+            frames.append((image, occluder, hitbox, footprint))
+        return frames
+
+    def get_direction(self, view_angle):
+        """Indice de l'image à utiliser quand la caméra est à view_angle (radians) de la face avant"""
+        return round(view_angle * self.directions / (2 * math.pi)) % self.directions
+
+    def get_anchor_offset(self, height, render_scale=1.0):
+        """Décalage vers le bas qui pose une image de cette hauteur (pixels) sur le sol"""
+        return 40 * render_scale + height * self.anchor_factor
+
+
+class PrototypeRegistry:
+    """Registre des prototypes de texture, indexés par chemin et par identifiant"""
+    def __init__(self):
+        self.by_path = {}
+        self.by_id = []
+
+    def get(self, path):
+        """Retourne le prototype d'une texture, créé au premier objet qui l'utilise"""
+        prototype = self.by_path.get(path)
+        if prototype is None:
+            prototype = TexturePrototype(len(self.by_id), path)
+            self.by_path[path] = prototype
+            self.by_id.append(prototype)
+        return prototype
+
+
+PROTOTYPES = PrototypeRegistry()
@@ -0,0 +1,200 @@
+"""Module contenant les backends de rendu du jeu (surfaces logicielles ou Renderer SDL2)"""
+import copy
+import os
+import pygame
+from particles import draw_particles
+from day_night import WHITE, tint_surface
+
+
+def fit_width(image, width):
+    """Redimensionne une image de fond à la largeur donnée en gardant ses proportions"""
+    if image.get_width() == width:
+        return image
+    height = max(1, round(image.get_height() * width / image.get_width()))
+    return pygame.transform.smoothscale(image, (width, height))
+
+
+class SurfaceBackend:
+    """Rendu par surfaces : le monde est dessiné à la résolution interne puis agrandi une fois vers l'écran"""
+    name = "surface"
+    resamples_sprites = True  # Les objets gardent une copie redimensionnée de leur image
+
+    def __init__(self, viewport, caption="D8 Engine"):
+        pygame.display.set_caption(caption)
+        # Copie propre au rendu : sa résolution interne suit les instantanés dessinés, pas la simulation
+        self.viewport = copy.copy(viewport)
+        self.screen = pygame.display.set_mode((viewport.width, viewport.height))
+        self.hud = self.screen  # Le HUD est dessiné directement sur l'écran
+        self.backdrops = {}  # id(image) -> image mise à la largeur de la surface du monde
+        self.tinted_backdrops = {}  # id(image) -> (teinte, image mise à la largeur et teintée)
+        self.set_render_scale(viewport.render_scale)
+
+    def set_render_scale(self, render_scale):
+        """Change la résolution interne du rendu 3D ; les fonds sont remis à l'échelle une seule fois"""
+        self.viewport.set_render_scale(render_scale)
+        if self.viewport.render_size == self.screen.get_size():
+            self.world = self.screen  # Pleine résolution : dessin direct, sans agrandissement
+        else:
+            self.world = pygame.Surface(self.viewport.render_size).convert()
+        self.backdrops.clear()
+        self.tinted_backdrops.clear()
+
+    def begin_world(self):
+        pass
+
+    def draw_backdrop(self, image, y, tint=WHITE):
+        """Dessine une image de fond (sol) à la largeur de la vue, à la hauteur y (pixels de sortie)"""
+        fitted = self.backdrops.get(id(image))
+        if fitted is None:
+            fitted = fit_width(image, self.viewport.render_size[0])
+            self.backdrops[id(image)] = fitted
+        if tint != WHITE:
+            # Refaite seulement au changement de tranche du cycle jour/nuit
+            entry = self.tinted_backdrops.get(id(image))
+            if entry is None or entry[0] != tint:
+                entry = (tint, tint_surface(fitted.copy(), tint))
+                self.tinted_backdrops[id(image)] = entry
+            fitted = entry[1]
+        self.world.blit(fitted, (0, y * self.viewport.render_scale))
+
+    def draw_sky(self, skybox, angle, tint=WHITE):
+        """Dessine la portion du ciel panoramique visible pour l'angle de la caméra (un seul blit)"""
+        surface, area = skybox.window(angle, self.viewport.render_size[0], tint)
+        self.world.blit(surface, (0, 0), area)
+
+    def draw_sprites(self, sprites, tint=WHITE):
+        """Dessine les sprites (image redimensionnée, image d'origine, rectangle) dans l'ordre donné
+
+        Les images redimensionnées sont déjà teintées (la teinte fait partie du cache de taille).
+        """
+        self.world.blits([(image, rect[:2]) for image, _, rect in sprites], doreturn=False)
+
+    def draw_particles(self, projected):
+        draw_particles(self.world, projected)
+
+    def end_world(self):
+        # Agrandissement unique vers l'écran ; le HUD est dessiné ensuite en résolution native
+        if self.world is not self.screen:
+            pygame.transform.scale(self.world, self.screen.get_size(), self.screen)
+
+    def dim(self, alpha):
+        """Assombrit tout ce qui est déjà dessiné (menu pause)"""
+        overlay = pygame.Surface(self.screen.get_size())
+        overlay.set_alpha(alpha)
+        overlay.fill((0, 0, 0))
+        self.screen.blit(overlay, (0, 0))
+
+    def present(self):
+        pygame.display.flip()
+
+
+class SDL2Backend:
+    """Rendu par Renderer/Texture SDL2 : les images sont mises à l'échelle au moment du dessin
+
+    Chaque image n'est envoyée qu'une fois sous forme de texture ; aucune surface intermédiaire
+    n'est créée quand un objet change de taille. Le HUD et les particules sont dessinés sur des
+    surfaces transparentes, envoyées en une texture chacune. Fonctionne aussi avec le
+    renderer logiciel de SDL (sans carte graphique).
+    """
+    name = "sdl2"
+    resamples_sprites = False
+
+    def __init__(self, viewport, caption="D8 Engine"):
+        from pygame._sdl2.video import Window, Renderer, Texture
+        self.Texture = Texture
+        # Filtrage linéaire lors de la mise à l'échelle des textures
+        os.environ.setdefault("SDL_RENDER_SCALE_QUALITY", "1")
+
+        # Une fenêtre d'affichage cachée reste nécessaire pour convert()/convert_alpha()
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)
+        self.viewport = copy.copy(viewport)  # Résolution interne des instantanés dessinés
+        self.window = Window(caption, (viewport.width, viewport.height))
+        self.renderer = Renderer(self.window)
+        self.textures = {}  # id(image) -> (image, texture)
+
+        self.hud = pygame.Surface((viewport.width, viewport.height), pygame.SRCALPHA)
+        self.hud_texture = Texture(self.renderer, self.hud.get_size(), streaming=True)
+        self.hud_texture.blend_mode = pygame.BLENDMODE_BLEND
+        self.set_render_scale(viewport.render_scale)
+
+    def set_render_scale(self, render_scale):
+        self.viewport.set_render_scale(render_scale)
+        size = self.viewport.render_size
+        self.world = self.Texture(self.renderer, size, target=True)
+        self.particle_layer = pygame.Surface(size, pygame.SRCALPHA)
+        self.particle_texture = self.Texture(self.renderer, size, streaming=True)
+        self.particle_texture.blend_mode = pygame.BLENDMODE_BLEND
+
+    def texture_of(self, image):
+        """Retourne la texture d'une image, créée à la première utilisation"""
+        entry = self.textures.get(id(image))
+        if entry is None:
+            # L'image est gardée avec sa texture pour que son id ne soit pas réutilisé
+            entry = (image, self.Texture.from_surface(self.renderer, image))
+            self.textures[id(image)] = entry
+        return entry[1]
+
+    def begin_world(self):
+        self.renderer.target = self.world
+        self.renderer.draw_color = (0, 0, 0, 255)
+        self.renderer.clear()
+        self.hud.fill((0, 0, 0, 0))
+
+    def draw_backdrop(self, image, y, tint=WHITE):
+        # Les teintes sont appliquées par modulation de couleur des textures, sans image teintée
+        width = self.viewport.render_size[0]
+        height = round(image.get_height() * width / image.get_width())
+        texture = self.texture_of(image)
+        texture.color = tint
+        texture.draw(dstrect=(0, round(y * self.viewport.render_scale), width, height))
+
+    def draw_sky(self, skybox, angle, tint=WHITE):
+        # Le ciel est pré-tuilé à la largeur de sortie ; la texture le réduit à la résolution interne
+        surface, area = skybox.window(angle, self.viewport.width)
+        render_scale = self.viewport.render_scale
+        texture = self.texture_of(surface)
+        texture.color = tint
+        texture.draw(srcrect=area, dstrect=(0, 0, self.viewport.render_size[0], round(area[3] * render_scale)))
+
+    def draw_sprites(self, sprites, tint=WHITE):
+        for _, original_image, rect in sprites:
+            texture = self.texture_of(original_image)
+            texture.color = tint
+            texture.draw(dstrect=rect)
+
+    def draw_particles(self, projected):
+        if projected is None:
+            return
+        self.particle_layer.fill((0, 0, 0, 0))
+        draw_particles(self.particle_layer, projected)
+        self.particle_texture.update(self.particle_layer)
+        self.particle_texture.draw()
+
+    def end_world(self):
+        self.renderer.target = None
+        self.world.draw(dstrect=(0, 0, self.viewport.width, self.viewport.height))
+
+    def dim(self, alpha):
+        """Assombrit le monde déjà dessiné ; le HUD, envoyé ensuite, reste par-dessus"""
+        self.renderer.draw_blend_mode = pygame.BLENDMODE_BLEND
+        self.renderer.draw_color = (0, 0, 0, alpha)
+        self.renderer.fill_rect((0, 0, self.viewport.width, self.viewport.height))
+
+    def present(self):
+        self.hud_texture.update(self.hud)
+        self.hud_texture.draw()
+        self.renderer.present()
+
+
+BACKENDS = {SurfaceBackend.name: SurfaceBackend, SDL2Backend.name: SDL2Backend}
+
+
+def create_backend(name, viewport, caption="D8 Engine"):
+    """Crée le backend demandé ; revient au rendu par surfaces s'il n'est pas disponible"""
+    backend_class = BACKENDS.get(name, SurfaceBackend)
+    if backend_class is not SurfaceBackend:
+        try:
+            return backend_class(viewport, caption)
+        except (ImportError, RuntimeError, pygame.error) as error:  # Erreurs SDL2 : RuntimeError
+            print(f"Render backend '{name}' unavailable ({error}), using surfaces")
+    return SurfaceBackend(viewport, caption)
@@ -0,0 +1,68 @@
+"""Module contenant les ombres (ellipses sombres) posées au pied des objets"""
+import math
+import numpy as np
+import pygame
+
+
+def ground_footprint(image, min_alpha=128):
+    """Retourne l'emprise au sol d'une image (centre x, bas, largeur), en fractions de l'image, ou None
+
+    Le bas est la dernière rangée opaque ; la largeur couvre la base de l'objet, et au moins
+    60 % de sa largeur visible pour qu'un tronc fin ait quand même une ombre de feuillage.
+    """
+    width, height = image.get_size()
+    bounds = image.get_bounding_rect(min_alpha)
+    if not bounds.width or not bounds.height:
+        return None
+    # Colonnes opaques dans la bande du bas (5 % de la hauteur visible)
+    band = max(2, bounds.height // 20)
+    alpha = pygame.surfarray.array_alpha(image)[:, bounds.bottom - band:bounds.bottom] >= min_alpha
+    columns = np.flatnonzero(alpha.any(axis=1))
+    base_left, base_right = int(columns[0]), int(columns[-1]) + 1
+    footprint_width = max(base_right - base_left, 0.6 * bounds.width)
+    return (base_left + base_right) / 2 / width, bounds.bottom / height, footprint_width / width
+
+
+class ShadowCache:
+    """Ombres floues précalculées, une par palier de largeur
+
+    Les largeurs sont arrondies à des paliers géométriques (8 % d'écart) : une ombre n'est
+    calculée qu'une fois par palier, puis réutilisée par toutes les textures et toutes les
+    frames. Placer une ombre ne crée donc aucune surface.
+    """
+    def __init__(self, aspect=0.25, opacity=110, step=1.08):
+        self.aspect = aspect  # Hauteur / largeur de l'ellipse (sol vu en perspective)
+        self.opacity = opacity  # Alpha au centre de l'ombre
+        self.log_step = math.log(step)
+        self.cache = {}  # Palier -> ombre
+
+    def get(self, width):
+        """Retourne l'ombre du palier le plus proche de la largeur donnée (pixels)"""
+        bucket = max(0, round(math.log(max(width, 1)) / self.log_step))
+        shadow = self.cache.get(bucket)
+        if shadow is None:
+            shadow = self._bake(max(1, round(math.exp(bucket * self.log_step))))
+            self.cache[bucket] = shadow
+        return shadow
+
+    def _bake(self, width):
+        height = max(1, round(width * self.aspect))
+        shadow = pygame.Surface((width, height), pygame.SRCALPHA)
+        shadow.fill((0, 0, 0, 0))
+        # Alpha décroissant du centre vers le bord de l'ellipse
+        x = (np.arange(width) + 0.5) / width * 2 - 1
+        y = (np.arange(height) + 0.5) / height * 2 - 1
+        falloff = np.clip(1 - (x[:, None] ** 2 + y[None, :] ** 2), 0, 1) ** 0.7
+        alpha = pygame.surfarray.pixels_alpha(shadow)
+        alpha[:] = (falloff * self.opacity).astype(np.uint8)
+        del alpha  # Libère le verrou de la surface
+        return shadow
+
+    def place(self, footprint, rect):
+        """Retourne le sprite (ombre, ombre, rectangle) au pied d'un objet dessiné dans rect"""
+        x, y, width, height = rect
+        center_x, bottom, footprint_width = footprint
+        shadow = self.get(footprint_width * width)
+        shadow_width, shadow_height = shadow.get_size()
+        return shadow, shadow, (int(x + center_x * width - shadow_width / 2),
+                                int(y + bottom * height - shadow_height / 2), shadow_width, shadow_height)
@@ -0,0 +1,70 @@
+"""Module contenant le ciel panoramique qui défile avec l'angle de la caméra"""
+import math
+import pygame
+from day_night import WHITE, tint_surface
+
+
+class Skybox:
+    """Ciel panoramique répété horizontalement sur 360°
+
+    Pour chaque largeur de vue, l'image est mise à l'échelle et répétée une seule fois sur une
+    surface opaque au format de l'écran, d'une période (un tour complet) plus une largeur de
+    vue : n'importe quelle fenêtre se copie alors en un seul blit, sans calcul de raccord.
+    """
+    def __init__(self, image, fov=90.0):
+        # Le ciel n'a pas de transparence : une surface opaque se copie bien plus vite
+        self.image = image.convert()
+        self.fov = fov
+        self.tiled = {}  # Largeur de vue -> (surface pré-tuilée, période en pixels)
+        self.tiles = {}  # Largeur de vue -> (copies de l'image, normale et retournée ; largeur d'une copie)
+        self.tinted = {}  # Largeur de vue -> (teinte, surface pré-tuilée teintée), refaite au changement de teinte
+
+    def get(self, width):
+        """Retourne (surface pré-tuilée, période) pour une vue de la largeur donnée"""
+        entry = self.tiled.get(width)
+        if entry is None:
+            entry = self._build(width)
+            self.tiled[width] = entry
+        return entry
+
+    def _build(self, width):
+        # Un tour complet fait 2π fois la focale (largeur / 2 / tan(fov / 2)) : au centre de l'écran,
+        # le ciel défile alors exactement comme le monde. La période est découpée en un nombre
+        # pair de copies, une sur deux retournée horizontalement : les bords qui se touchent sont
+        # identiques, sans raccord visible même si l'image n'est pas conçue pour se répéter
+        period = max(2, round(math.pi * width / math.tan(math.radians(self.fov) / 2)))
+        copies = max(2, 2 * round(period / width / 2))
+        tile_width = period / copies
+        tile_height = max(1, round(self.image.get_height() * tile_width / self.image.get_width()))
+
+        tile = pygame.transform.smoothscale(self.image, (math.ceil(tile_width), tile_height))
+        tiles = (tile, pygame.transform.flip(tile, True, False))
+        self.tiles[width] = (tiles, tile_width)
+        surface = pygame.Surface((period + width, tile_height)).convert()
+        self._compose(surface, tiles, tile_width)
+        return surface, period
+
+    @staticmethod
+    def _compose(surface, tiles, tile_width):
+        """Répète les copies (normale, retournée) sur toute la largeur de la surface"""
+        index = 0
+        while index * tile_width < surface.get_width():
+            surface.blit(tiles[index % 2], (round(index * tile_width), 0))
+            index += 1
+
+    def window(self, angle, width, tint=WHITE):
+        """Retourne (surface, zone source) de la portion du ciel visible pour cet angle de caméra"""
+        surface, period = self.get(width)
+        if tint != WHITE:
+            entry = self.tinted.get(width)
+            if entry is None or entry[0] != tint:
+                # Seules les deux copies de l'image sont teintées, puis répétées dans la même surface
+                tinted = entry[1] if entry else pygame.Surface(surface.get_size()).convert()
+                tiles, tile_width = self.tiles[width]
+                self._compose(tinted, [tint_surface(tile.copy(), tint) for tile in tiles], tile_width)
+                entry = (tint, tinted)
+                self.tinted[width] = entry
+            surface = entry[1]
+        # Tourner à droite (angle qui diminue) fait glisser le monde vers la gauche de l'écran : le ciel suit
+        offset = int((-angle / (2 * math.pi) * period) % period)
+        return surface, (offset, 0, width, surface.get_height())
@@ -0,0 +1,105 @@
+"""Module contenant une grille spatiale uniforme pour retrouver rapidement les objets de la map"""
+
+
+class SpatialGrid:
+    """Index spatial (x, z) par cellules, pour les objets de l'éditeur (dictionnaires)
+
+    Tient aussi un histogramme plus grossier (cluster_factor x cluster_factor cellules)
+    du nombre d'objets, utilisé pour la vue de densité quand l'éditeur est dézoomé.
+    """
+    def __init__(self, cell_size=200, cluster_factor=3):
+        self.cell_size = cell_size
+        self.cluster_factor = cluster_factor
+        self.cluster_size = cell_size * cluster_factor
+        self.cells = {}  # (colonne, ligne) -> {id(objet): objet}
+        self.object_cells = {}  # id(objet) -> cellule actuelle
+        self.cluster_counts = {}  # (colonne, ligne) de cluster -> nombre d'objets
+
+    def _cell_of(self, x, z):
+        return int(x // self.cell_size), int(z // self.cell_size)
+
+    def __len__(self):
+        return len(self.object_cells)
+
+    def _count_cluster(self, cell, sign):
+        key = (cell[0] // self.cluster_factor, cell[1] // self.cluster_factor)
+        count = self.cluster_counts.get(key, 0) + sign
+        if count:
+            self.cluster_counts[key] = count
+        else:
+            del self.cluster_counts[key]
+
+    def insert(self, obj):
+        cell = self._cell_of(obj['x'], obj['z'])
+        self.cells.setdefault(cell, {})[id(obj)] = obj
+        self.object_cells[id(obj)] = cell
+        self._count_cluster(cell, 1)
+
+    def remove(self, obj):
+        cell = self.object_cells.pop(id(obj), None)
+        if cell is None:
+            return
+        self._count_cluster(cell, -1)
+        bucket = self.cells[cell]
+        del bucket[id(obj)]
+        if not bucket:
+            del self.cells[cell]
+
+    def move(self, obj):
+        """Met à jour la cellule d'un objet après modification de ses coordonnées"""
+        cell = self._cell_of(obj['x'], obj['z'])
+        if self.object_cells.get(id(obj)) != cell:
+            self.remove(obj)
+            self.cells.setdefault(cell, {})[id(obj)] = obj
+            self.object_cells[id(obj)] = cell
+            self._count_cluster(cell, 1)
+
+    def clear(self):
+        self.cells.clear()
+        self.object_cells.clear()
+        self.cluster_counts.clear()
+
+    def query_rect(self, min_x, min_z, max_x, max_z):
+        """Retourne les objets dont la position est dans le rectangle"""
+        first_col, first_row = self._cell_of(min_x, min_z)
+        last_col, last_row = self._cell_of(max_x, max_z)
+        found = []
+        # Peu de cellules occupées : parcourir les cellules existantes est plus rapide
+        if (last_col - first_col + 1) * (last_row - first_row + 1) > len(self.cells):
+            candidates = [bucket for (col, row), bucket in self.cells.items()
+                          if first_col <= col <= last_col and first_row <= row <= last_row]
+        else:
+            candidates = [self.cells[(col, row)]
+                          for col in range(first_col, last_col + 1)
+                          for row in range(first_row, last_row + 1)
+                          if (col, row) in self.cells]
+        for bucket in candidates:
+            for obj in bucket.values():
+                if min_x <= obj['x'] <= max_x and min_z <= obj['z'] <= max_z:
+                    found.append(obj)
+        return found
+
+    def query_nearest(self, x, z, radius):
+        """Retourne l'objet le plus proche à moins de radius (distance de Chebyshev), ou None"""
+        best = None
+        best_distance = radius
+        for obj in self.query_rect(x - radius, z - radius, x + radius, z + radius):
+            distance = max(abs(obj['x'] - x), abs(obj['z'] - z))
+            if distance < best_distance:
+                best = obj
+                best_distance = distance
+        return best
+
+    def query_clusters(self, min_x, min_z, max_x, max_z):
+        """Retourne les clusters non vides touchant le rectangle : ((x, z) du coin, nombre d'objets)"""
+        size = self.cluster_size
+        first_col, first_row = int(min_x // size), int(min_z // size)
+        last_col, last_row = int(max_x // size), int(max_z // size)
+        counts = self.cluster_counts
+        if (last_col - first_col + 1) * (last_row - first_row + 1) > len(counts):
+            return [((col * size, row * size), count) for (col, row), count in counts.items()
+                    if first_col <= col <= last_col and first_row <= row <= last_row]
+        return [((col * size, row * size), counts[(col, row)])
+                for col in range(first_col, last_col + 1)
+                for row in range(first_row, last_row + 1)
+                if (col, row) in counts]
@@ -0,0 +1,117 @@
+"""Module contenant le redimensionnement des sprites sur un pool de threads"""
+import os
+from bisect import bisect_left, insort
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+from day_night import WHITE, tint_surface
+
+
+class SpriteResampler:
+    """Redimensionne les images des objets hors de la boucle principale
+
+    pygame.transform.smoothscale libère le GIL : les demandes d'une frame s'exécutent en
+    parallèle pendant la suivante. Les images prêtes sont partagées entre tous les objets
+    d'une même texture (cache LRU borné en pixels). Tant qu'une taille n'est pas prête,
+    get() retourne la taille en cache la plus proche, ou l'image affichée jusque-là : aucun
+    redimensionnement n'a lieu sur le thread appelant, une frame n'est jamais bloquée.
+    La teinte du cycle jour/nuit fait partie de la clé : elle est appliquée au redimensionnement.
+    Au changement de teinte, les images de l'ancienne restent affichées le temps de préparer
+    la nouvelle : aucun objet ne retombe sur un calcul immédiat.
+    """
+    def __init__(self, workers=None, max_pixels=32_000_000):
+        self.executor = ThreadPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 1),
+                                           thread_name_prefix="resample")
+        self.max_pixels = max_pixels
+        self.cached_pixels = 0
+        self.cache = OrderedDict()  # (id(image), taille, teinte) -> image redimensionnée
+        self.sizes = {}  # id(image) -> (hauteurs triées, {hauteur: {(largeur, teinte): image}}), pour chercher la plus proche
+        self.sources = {}  # id(image) -> image d'origine (garde l'id valide tant qu'elle a des entrées)
+        self.references = Counter()  # id(image) -> entrées en cache et demandes en cours
+        self.pending = {}  # (id(image), taille, teinte) -> future
+        self.requested = set()  # Demandes de la frame en cours
+        self.placeholder = pygame.Surface((1, 1), pygame.SRCALPHA)  # Vide : objet pas encore prêt
+        self.placeholder.fill((0, 0, 0, 0))
+
+    def get(self, image, size, tint=WHITE, fallback=None):
+        """Retourne (image, exacte) : l'image à la taille demandée si prête
+
+        Sinon la taille en cache la plus proche ; pour une image jamais redimensionnée,
+        fallback (ex: l'image affichée jusque-là) ou une image vide pendant une ou deux frames.
+        """
+        key = (id(image), size, tint)
+        surface = self.cache.get(key)
+        if surface is not None:
+            self.cache.move_to_end(key)
+            return surface, True
+
+        self.requested.add(key)
+        if key not in self.pending:
+            self.sources[id(image)] = image
+            self.references[id(image)] += 1
+            self.pending[key] = self.executor.submit(scale_tinted, image, size, tint)
+
+        entry = self.sizes.get(id(image))
+        if entry:
+            # Hauteur en cache la plus proche (toutes teintes), de préférence à la teinte demandée
+            heights, by_height = entry
+            height = size[1]
+            index = bisect_left(heights, height)
+            if index == len(heights) or (index > 0 and height - heights[index - 1] < heights[index] - height):
+                index -= 1
+            for (_, cached_tint), surface in by_height[heights[index]].items():
+                if cached_tint == tint:
+                    break
+            return surface, False
+        return (fallback if fallback is not None else self.placeholder), False
+
+    def begin_frame(self):
+        """Récupère les images terminées et annule les demandes que plus personne n'attend"""
+        for key, future in list(self.pending.items()):
+            if future.done():
+                del self.pending[key]
+                if not future.cancelled():
+                    self._store(key, future.result())
+                else:
+                    self._release(key[0])
+            elif key not in self.requested and future.cancel():
+                del self.pending[key]
+                self._release(key[0])
+        self.requested = set()
+
+    def _store(self, key, surface):
+        image_id, size, tint = key
+        self.cache[key] = surface
+        heights, by_height = self.sizes.setdefault(image_id, ([], {}))
+        if size[1] not in by_height:
+            insort(heights, size[1])
+            by_height[size[1]] = {}
+        by_height[size[1]][(size[0], tint)] = surface
+        self.cached_pixels += size[0] * size[1]
+        while self.cached_pixels > self.max_pixels and len(self.cache) > 1:
+            (old_id, old_size, old_tint), _ = self.cache.popitem(last=False)
+            heights, by_height = self.sizes[old_id]
+            bucket = by_height[old_size[1]]
+            del bucket[(old_size[0], old_tint)]
+            if not bucket:
+                del by_height[old_size[1]]
+                heights.remove(old_size[1])
+                if not heights:
+                    del self.sizes[old_id]
+            self.cached_pixels -= old_size[0] * old_size[1]
+            self._release(old_id)
+
+    def _release(self, image_id):
+        """Oublie l'image d'origine quand plus aucune entrée ni demande ne l'utilise"""
+        self.references[image_id] -= 1
+        if self.references[image_id] <= 0:
+            del self.references[image_id]
+            del self.sources[image_id]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def scale_tinted(image, size, tint=WHITE):
+    """Redimensionne une image (filtrée) et lui applique une teinte"""
+    return tint_surface(pygame.transform.smoothscale(image, size), tint)
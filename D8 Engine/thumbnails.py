@@ -0,0 +1,97 @@
+"""Module contenant l'atlas de miniatures des textures pour l'éditeur de map"""
+import hashlib
+import os
+import pygame
+
+
+class ThumbnailAtlas:
+    """Décode chaque texture une seule fois, la réduit à quelques tailles et la range dans un atlas partagé
+
+    Les miniatures sont aussi enregistrées sur le disque, indexées par le hash du fichier
+    de texture, pour que la réouverture de l'éditeur n'ait plus rien à décoder.
+    """
+    SIZES = (16, 32, 64)
+
+    def __init__(self, cache_dir=".thumbnails", columns=8, rows=4):
+        self.cache_dir = cache_dir
+        self.columns = columns
+        self.slot_width = sum(self.SIZES)
+        self.slot_height = max(self.SIZES)
+        self.atlas = pygame.Surface((self.slot_width * columns, self.slot_height * rows), pygame.SRCALPHA)
+        self.entries = {}  # Chemin de texture -> {taille: rectangle dans l'atlas}, ou None si illisible
+        self.slot_count = 0
+
+    def get(self, texture_path, size):
+        """Retourne (atlas, rectangle) de la miniature à la taille demandée, ou None"""
+        entry = self.entries.get(texture_path, False)
+        if entry is False:
+            entry = self._add(texture_path)
+            self.entries[texture_path] = entry
+        if entry is None:
+            return None
+        return self.atlas, entry[size]
+
+    def _add(self, texture_path):
+        """Charge (depuis le cache disque si possible) la bande de miniatures d'une texture"""
+        try:
+            with open(texture_path, 'rb') as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            return None
+
+        cache_path = os.path.join(self.cache_dir, digest + ".png")
+        strip = None
+        if os.path.exists(cache_path):
+            try:
+                strip = pygame.image.load(cache_path).convert_alpha()
+            except pygame.error:
+                strip = None
+        if strip is None:
+            try:
+                strip = self._build_strip(pygame.image.load(texture_path).convert_alpha())
+            except pygame.error:
+                return None
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                pygame.image.save(strip, cache_path)
+            except (pygame.error, OSError) as error:
+                # Cache disque indisponible (lecture seule, disque plein) : la miniature reste en mémoire
+                print(f"Thumbnail cache: cannot write {cache_path} ({error})")
+
+        slot_x, slot_y = self._allocate_slot()
+        self.atlas.fill((0, 0, 0, 0), (slot_x, slot_y, self.slot_width, self.slot_height))
+        self.atlas.blit(strip, (slot_x, slot_y))
+
+        # Rectangle réellement occupé par chaque taille (les miniatures gardent leurs proportions)
+        rects = {}
+        offset = 0
+        for size in self.SIZES:
+            box = pygame.Rect(offset, 0, size, size)
+            bounds = strip.subsurface(box).get_bounding_rect()
+            rects[size] = bounds.move(slot_x + offset, slot_y)
+            offset += size
+        return rects
+
+    def _build_strip(self, image):
+        """Réduit une texture à chaque taille, côte à côte sur une bande transparente"""
+        strip = pygame.Surface((self.slot_width, self.slot_height), pygame.SRCALPHA)
+        width, height = image.get_size()
+        offset = 0
+        for size in self.SIZES:
+            ratio = size / max(width, height)
+            thumb_size = (max(1, int(width * ratio)), max(1, int(height * ratio)))
+            strip.blit(pygame.transform.smoothscale(image, thumb_size), (offset, 0))
+            offset += size
+        return strip
+
+    def _allocate_slot(self):
+        """Retourne la position du prochain emplacement libre, en agrandissant l'atlas si besoin"""
+        index = self.slot_count
+        self.slot_count += 1
+        column = index % self.columns
+        row = index // self.columns
+        if (row + 1) * self.slot_height > self.atlas.get_height():
+            grown = pygame.Surface((self.atlas.get_width(), self.atlas.get_height() * 2), pygame.SRCALPHA)
+            grown.blit(self.atlas, (0, 0))
+            self.atlas = grown
+        return column * self.slot_width, row * self.slot_height
@@ -1,6 +1,8 @@
 """Module contenant les fonctions 3D et la classe GameObject pour le monde"""
 import pygame
 import math
+from day_night import WHITE, tint_surface
+from prototypes import PROTOTYPES
 
 
 def rotate_point_y(x, z, angle):
@@ -12,11 +14,32 @@ def rotate_point_y(x, z, angle):
     return new_x, new_z
 
 
-def project_3d_to_2d(x, y, z, camera_x, camera_y, camera_z, camera_angle):
-    """Projette un point 3D vers l'écran 2D avec la caméra"""
-    # Distance focale pour la projection
-    focal_length = 500
+class Viewport:
+    """Taille de sortie, champ de vision et résolution interne du rendu 3D
+
+    La projection se fait toujours en coordonnées de sortie (HUD, visée) ; seul le dessin
+    du monde se fait sur une surface réduite de render_scale, agrandie une fois par frame.
+    """
+    def __init__(self, width=1000, height=600, fov=90.0, render_scale=1.0):
+        self.width = width
+        self.height = height
+        self.fov = fov  # Champ de vision horizontal en degrés
+        self.center_x = width / 2
+        self.center_y = height / 2
+        self.focal_length = self.center_x / math.tan(math.radians(fov) / 2)
+        self.set_render_scale(render_scale)
     
+    def set_render_scale(self, render_scale):
+        self.render_scale = max(0.1, min(render_scale, 1.0))
+        self.render_size = (max(1, int(self.width * self.render_scale)), max(1, int(self.height * self.render_scale)))
+
+
+DEFAULT_VIEWPORT = Viewport()
+
+
+def project_3d_to_2d(x, y, z, camera_x, camera_y, camera_z, camera_angle,
+                     focal_length=500, center_x=500, center_y=300):
+    """Projette un point 3D vers l'écran 2D avec la caméra"""
     # Position relative à la caméra
     rel_x = x - camera_x
     rel_y = y - camera_y
@@ -31,50 +54,73 @@ def project_3d_to_2d(x, y, z, camera_x, camera_y, camera_z, camera_angle):
     
     # Projection perspective
     scale = focal_length / rotated_z
-    screen_x = 500 + (rotated_x * scale)
-    screen_y = 300 - (rel_y * scale)
+    screen_x = center_x + (rotated_x * scale)
+    screen_y = center_y - (rel_y * scale)
     
     return screen_x, screen_y, scale
 
 
 class GameObject:
-    """Classe de base pour les objets du décor avec coordonnées 3D"""
-    # Cache partagé entre toutes les instances pour les images
-    _image_cache = {}
-    
-    def __init__(self, image_path, x, y, z, destroyable=False):
-        # Utilise le cache d'images pour éviter de recharger plusieurs fois la même image
-        if image_path not in GameObject._image_cache:
-            GameObject._image_cache[image_path] = pygame.image.load(image_path).convert_alpha()
-        self.original_image = GameObject._image_cache[image_path]
-        self.image = self.original_image
+    """Classe de base pour les objets du décor avec coordonnées 3D
+
+    Les données propres à la texture (image, ancrage, collision, visée, niveaux de détail)
+    sont dans son prototype, calculé une seule fois et partagé par tous ses objets. Les
+    textures à plusieurs directions affichent l'image précalculée qui correspond à l'angle
+    entre la caméra et l'orientation (yaw) de l'objet.
+    """
+    def __init__(self, image_path, x, y, z, destroyable=False, layer="scenery", yaw=0.0):
+        self.prototype = PROTOTYPES.get(image_path)
+        self.prototype_id = self.prototype.id
+        self.image = self.prototype.image
         self.x = x  # Position X (gauche/droite)
         self.y = y  # Position Y (haut/bas)
         self.z = z  # Position Z (profondeur)
         self.destroyable = destroyable  # Peut être détruit
-        self.original_height = self.original_image.get_height()  # Hauteur pour calcul d'ancrage
-        self.original_width = self.original_image.get_width()
+        self.layer = layer  # Calque de l'éditeur (décor, ennemis, objets)
+        self.yaw = yaw  # Orientation en degrés (0 = face avant tournée vers +Z)
+        self.map_key = (image_path, x, y, z, destroyable, yaw)  # Identité dans le fichier de map (rechargement à chaud)
+        self.set_direction(0)
         self.screen_x = 0
         self.screen_y = 0
         self.scale = 1.0
+        self.display_scale = 1.0  # Échelle bornée réellement utilisée à l'écran
+        self.screen_height = self.original_height  # Hauteur affichée, en pixels de sortie
         self.visible = False
-        # Cache pour l'image redimensionnée
+        # Taille de dessin (résolution interne) et cache pour l'image redimensionnée
+        self.draw_size = (self.original_width, self.original_height)
         self.cached_size = (0, 0)
+        self.cached_tint = WHITE
         self.cached_image = None
-        
-    def update_projection(self, camera_x, camera_y, camera_z, camera_angle):
-        """Met à jour la projection 3D vers 2D"""
+    
+    def set_direction(self, direction):
+        """Choisit l'image (et ses rectangles opaque, visé et au sol) de la direction de vue donnée"""
+        self.direction = direction
+        self.original_image, self.occluder, self.hitbox, self.footprint = self.prototype.frames[direction]
+        self.original_width, self.original_height = self.original_image.get_size()
+        
+    def update_projection(self, camera_x, camera_y, camera_z, camera_angle, viewport=DEFAULT_VIEWPORT,
+                          resample=True, resampler=None):
+        """Met à jour la projection 3D vers 2D
+
+        Avec resample=False, seule la taille de dessin est calculée : aucune image redimensionnée
+        n'est créée (backend qui met les textures à l'échelle au dessin, ou update_image appelé
+        plus tard pour les seuls objets non cachés).
+        """
         screen_x, screen_y, scale = project_3d_to_2d(
             self.x, self.y, self.z,
-            camera_x, camera_y, camera_z, camera_angle
+            camera_x, camera_y, camera_z, camera_angle,
+            viewport.focal_length, viewport.center_x, viewport.center_y
         )
         
-        if screen_x is None or scale <= 0:
+        if screen_x is None:  # Derrière la caméra
             self.visible = False
             return
         
+        # Échelle d'affichage bornée (les objets lointains gardent une taille minimale)
+        scale_clamped = max(0.1, min(scale, 5.0))
+        
         # Culling frustum étendu - ne calcule que si potentiellement visible
-        if screen_x < -1000 or screen_x > 2000:
+        if screen_x < -viewport.width or screen_x > 2 * viewport.width:
             self.visible = False
             return
         
@@ -82,19 +128,47 @@ class GameObject:
         self.screen_x = screen_x
         self.screen_y = screen_y
         self.scale = scale
+        self.display_scale = scale_clamped
+        
+        # Image de la direction de vue : angle de la caméra autour de l'objet, moins son orientation
+        if self.prototype.directions > 1:
+            view_angle = math.atan2(self.x - camera_x, camera_z - self.z) - math.radians(self.yaw)
+            direction = self.prototype.get_direction(view_angle)
+            if direction != self.direction:
+                self.set_direction(direction)
+                self.cached_size = (0, 0)
         
         # Redimensionne l'image selon la distance SEULEMENT si la taille change
-        scale_clamped = max(0.1, min(scale, 5.0))
+        # (à la résolution interne du rendu : une image plus petite à redimensionner et à dessiner)
+        self.screen_height = int(self.original_height * scale_clamped)
+        scale_clamped *= viewport.render_scale
         new_width = int(self.original_width * scale_clamped)
         new_height = int(self.original_height * scale_clamped)
         
         # Utilise le cache pour éviter les redimensionnements inutiles
         if new_width > 0 and new_height > 0:
-            new_size = (new_width, new_height)
-            if self.cached_size != new_size:
+            self.draw_size = (new_width, new_height)
+            if resample:
+                self.update_image(resampler)
+    
+    def update_image(self, resampler=None, tint=WHITE):
+        """Redimensionne l'image à la taille de dessin calculée par update_projection, teinte comprise
+
+        Avec un resampler, le redimensionnement se fait en arrière-plan (taille la plus proche en attendant).
+        """
+        new_size = self.draw_size
+        if self.cached_size != new_size or self.cached_tint != tint:
+            if resampler is None:
                 self.cached_size = new_size
-                self.cached_image = pygame.transform.smoothscale(self.original_image, new_size)
-            self.image = self.cached_image
+                self.cached_tint = tint
+                self.cached_image = tint_surface(pygame.transform.smoothscale(self.original_image, new_size), tint)
+            else:
+                self.cached_image, exact = resampler.get(self.original_image, new_size, tint, self.cached_image)
+                if exact:
+                    self.cached_size = new_size
+                    self.cached_tint = tint
+                self.draw_size = self.cached_image.get_size()
+        self.image = self.cached_image
     
     def get_distance_squared(self, camera_x, camera_y, camera_z):
         """Calcule la distance au carré (plus rapide, suffisant pour le tri)"""
@@ -120,33 +194,49 @@ class GameObject:
         # Scale proche (1.0) = palier large (125px), scale loin (0.1) = palier étroit (35px)
         tolerance = 35 + (90 * self.scale)
         
-        # Calcul des centres de l'objet
-        obj_center_x = self.screen_x
-        obj_center_y = self.screen_y - (self.image.get_height() // 2)
+        # Centre de la partie visible de l'objet (hit-box du prototype)
+        obj_center_x, obj_center_y = self.get_hitbox_center()
         
         # Vérification si dans le palier
         dx = abs(obj_center_x - screen_center_x)
         dy = abs(obj_center_y - screen_center_y)
         
         return dx < tolerance and dy < tolerance
+    
+    def get_hitbox_center(self):
+        """Centre de la hit-box à l'écran (pixels de sortie), avant l'ancrage au sol"""
+        left, top, right, bottom = self.hitbox
+        height = self.screen_height
+        width = height * self.original_width / self.original_height
+        return (self.screen_x + ((left + right) / 2 - 0.5) * width,
+                self.screen_y - height + (top + bottom) / 2 * height)
+    
+    def get_aim_point(self, ground_offset=0):
+        """Centre de la hit-box tel qu'il est dessiné (ancrage au sol compris), en pixels de sortie"""
+        x, y = self.get_hitbox_center()
+        return x, y + self.prototype.get_anchor_offset(self.screen_height) + ground_offset
             
-    def draw(self, screen, ground_offset=0):
-        """Dessine l'objet si visible"""
-        if not self.visible or self.screen_x < -500 or self.screen_x > 1500:
-            return
+    def get_draw_rect(self, ground_offset=0, viewport=DEFAULT_VIEWPORT):
+        """Retourne le rectangle (x, y, largeur, hauteur) de l'objet sur la surface du monde, ou None"""
+        if not self.visible or self.screen_x < -viewport.width / 2 or self.screen_x > viewport.width * 1.5:
+            return None
+        render_scale = viewport.render_scale
         
         # Pré-calcul des dimensions (appel unique)
-        img_width = self.image.get_width()
-        img_height = self.image.get_height()
+        img_width, img_height = self.draw_size
         
         # Centre l'image sur la position
-        draw_x = int(self.screen_x - (img_width >> 1))  # Division par 2 optimisée
+        draw_x = int(self.screen_x * render_scale - (img_width >> 1))  # Division par 2 optimisée
         
-        # Abaisse l'objet pour qu'il soit posé sur le sol
-        # Facteur pré-calculé selon la taille originale
-        factor = 0.4 if self.original_height > 400 else 0.25
-        ground_anchor_offset = 40 + (img_height * factor)
+        # Abaisse l'objet pour qu'il soit posé sur le sol (facteur d'ancrage du prototype)
+        ground_anchor_offset = self.prototype.get_anchor_offset(img_height, render_scale)
         
-        draw_y = int(self.screen_y - img_height + ground_anchor_offset + ground_offset)
+        draw_y = int((self.screen_y + ground_offset) * render_scale - img_height + ground_anchor_offset)
         
-        screen.blit(self.image, (draw_x, draw_y))
+        return draw_x, draw_y, img_width, img_height
+            
+    def draw(self, screen, ground_offset=0, viewport=DEFAULT_VIEWPORT):
+        """Dessine l'objet si visible (sur la surface du monde, à la résolution interne)"""
+        rect = self.get_draw_rect(ground_offset, viewport)
+        if rect:
+            screen.blit(self.image, rect[:2])